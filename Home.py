@@ -1,17 +1,21 @@
 import datetime
 import os
-import tempfile
 import time
-import pandas as pd
 import streamlit as st
-try:
-    from moviepy.editor import AudioFileClip, VideoFileClip
-except ImportError:
-    from moviepy import AudioFileClip, VideoFileClip
-from faster_whisper import WhisperModel
-import toml
-import streamlit_logger as sl
 import languages as lang
+import checkpoints
+import cpu_tuning
+import exports
+import file_queue
+import metrics
+import model_cache
+import model_selection
+import pipeline
+from scheduler import scheduler
+import transcriber
+import transcript_cache
+import uploads
+from transcript import Chunking, Transcript, as_chunking
 
 
 st.set_page_config(
@@ -24,81 +28,118 @@ st.set_page_config(
 # -----------------------------
 # Local Css All Buttons
 # -----------------------------
-def local_css(file_name: str):
+@st.cache_resource
+def read_css(file_name: str):
+    # Read once per server process instead of on every rerun
     with open(file_name) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+        return f.read()
+
+
+def local_css(file_name: str):
+    st.markdown(f"<style>{read_css(file_name)}</style>", unsafe_allow_html=True)
 # Apply global styles
 local_css("styles/style.css")
+# Prometheus-style /metrics on localhost (once per server process)
+metrics.start_http_server()
+# Load the default model in the background so the first job starts warm
+pipeline.prewarm()
 
 # -------------------------------
 # Extract audio from video
 # -------------------------------
 def extract_audio_from_video(video_path):
     try:
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-            audio_path = temp_audio.name
-
-        clip = VideoFileClip(video_path)
-        audio_clip = clip.audio
-
-        if audio_clip is None:
-            clip.close()
-            return None
+        import streamlit_logger as sl  # pulls in proglog; only needed for videos
         logger = sl.StreamlitLogger()
-        audio_clip.write_audiofile(audio_path, codec="pcm_s16le",logger=logger)
-        audio_clip.close()
-        clip.close()
-
-        return audio_path
+        return pipeline.extract_audio_from_video(video_path, logger=logger)
     except Exception as e:
         st.error(f"Error extracting audio: {e}")
         return None
 
 # -------------------------------
-# Transcribe with faster-whisper + progress bar
+# Live preview of segments while decoding runs
 # -------------------------------
-def transcribe_audio_with_timestamps(audio_path, model_size="base", language=None):
-    try:
-        model = WhisperModel(model_size, device="cpu", compute_type="int8")
-        try:
-            clip = AudioFileClip(audio_path)
-            duration = clip.duration  # in seconds
-            clip.close()
-        except Exception:
-            duration = None  # fallback if moviepy can't read duration
+LIVE_MIN_INTERVAL = 1.0  # seconds between table refreshes
+
+
+class LivePreview:
+    def __init__(self):
+        self.segments = []
+        self.table = st.empty()
+        self.download = st.empty()
+        self.interval = LIVE_MIN_INTERVAL
+        self.last_render = 0.0
+        self.renders = 0
+
+    def add(self, seg_data):
+        self.segments.append(seg_data)
+        if time.monotonic() - self.last_render >= self.interval:
+            self.render()
+
+    def render(self):
+        import pandas as pd
+        started = time.monotonic()
+        df = pd.DataFrame(
+            [(s["start"], s["end"], s["text"]) for s in self.segments],
+            columns=["start_time", "end_time", "text"]
+        )
+        self.table.dataframe(df)
+        self.renders += 1
+        # on_click="ignore" so downloading does not rerun (and abort) the job
+        self.download.download_button(
+            "Download partial CSV ⬇",
+            data=df.to_csv(index=False, encoding="utf-8-sig"),
+            file_name="transcription_partial.csv",
+            mime="text/csv",
+            on_click="ignore",
+            key=f"partial_csv_{self.renders}"
+        )
+        # Keep rendering under ~10% of wall time as the table grows
+        self.last_render = time.monotonic()
+        self.interval = max(LIVE_MIN_INTERVAL, (self.last_render - started) * 10)
 
-        segments, info = model.transcribe(audio_path, word_timestamps=True, language=language)
+    def clear(self):
+        self.table.empty()
+        self.download.empty()
 
-        results = {"language": info.language, "segments": []}
 
+# -------------------------------
+# Transcribe with faster-whisper + progress bar
+# -------------------------------
+def transcribe_audio_with_timestamps(audio, model_size="base", language=None,
+                                     engine="standard", workers=None, window_seconds=300,
+                                     batch_size=8, live=False, compute_type="int8", trim=None,
+                                     checkpoint_key=None, content_hash=None):
+    try:
         # Progress bar
         progress_bar = st.progress(0)
         status_text = st.empty()
 
-        for segment in segments:
-            seg_data = {
-                "start": segment.start,
-                "end": segment.end,
-                "text": segment.text.strip(),
-                "words": []
-            }
+        def on_progress(fraction):
+            progress = min(int(fraction * 100), 100)
+            progress_bar.progress(progress)
+            status_text.text(f"⏳ Processing... {progress}%")
+
+        preview = LivePreview() if live else None
+
+        def on_wait(position):
+            status_text.text(f"🕒 Waiting for a free slot... position {position} in queue")
+
+        # Caps concurrent inference across all sessions of this server
+        with scheduler.acquire(
+            model_size, compute_type=compute_type, engine=engine,
+            workers=workers or transcriber.default_workers(),
+            on_wait=on_wait
+        ):
+            results = pipeline.transcribe_audio(
+                audio, model_size=model_size, language=language, engine=engine,
+                compute_type=compute_type, trim=trim, checkpoint_key=checkpoint_key,
+                content_hash=content_hash, workers=workers, window_seconds=window_seconds, batch_size=batch_size,
+                on_progress=on_progress, on_segment=preview.add if preview else None
+            )
+        if preview:
+            preview.clear()
 
-            if segment.words:
-                for w in segment.words:
-                    seg_data["words"].append({
-                        "start": w.start,
-                        "end": w.end,
-                        "text": w.word.strip()
-                    })
-
-            results["segments"].append(seg_data)
-
-            # ✅ Update progress
-            if duration and duration > 0:
-                progress = min(int((segment.end / duration) * 100), 100)
-                progress_bar.progress(progress)
-                status_text.text(f"⏳ Processing... {progress}%")
-        
         # Complete
         progress_bar.progress(100)
         status_text.text("✅ Transcription complete!")
@@ -109,45 +150,81 @@ def transcribe_audio_with_timestamps(audio_path, model_size="base", language=Non
         st.error(f"Error during transcription: {e}")
         return None
 
+
 # -------------------------------
-# Format transcription for CSV
+# Memoized table views of the current transcript
 # -------------------------------
-def format_transcription_for_csv(transcription_results, include_words=False, chunk_size=None):
-    formatted_data = []
-    if transcription_results and "segments" in transcription_results:
-        for segment in transcription_results["segments"]:
-            words = segment.get("words", [])
-
-            # case 1: chunking mode
-            if chunk_size and words:
-                for i in range(0, len(words), chunk_size):
-                    chunk = words[i:i + chunk_size]
-                    chunk_text = " ".join([w["text"] for w in chunk])
-                    start_time = chunk[0]["start"]
-                    end_time = chunk[-1]["end"]
-                    formatted_data.append({
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "text": chunk_text
-                    })
-
-            # case 2: include_words=True → add each word
-            elif include_words and words:
-                for w in words:
-                    formatted_data.append({
-                        "start_time": w["start"],
-                        "end_time": w["end"],
-                        "text": w["text"]
-                    })
-
-            # fallback: segment only
-            else:
-                formatted_data.append({
-                    "start_time": segment["start"],
-                    "end_time": segment["end"],
-                    "text": segment["text"].strip()
-                })
-    return formatted_data
+MAX_CACHED_VIEWS = 4
+
+
+def transcript_view(include_words, chunk_size):
+    # Chunking takes precedence over word rows, so both map to the same view
+    key = (False, chunk_size) if chunk_size else (include_words, None)
+    views = st.session_state.views
+    if key not in views:
+        with metrics.stage("format"):
+            df = st.session_state.transcript.to_dataframe(
+                include_words=include_words,
+                chunk_size=chunk_size
+            )
+        if len(views) >= MAX_CACHED_VIEWS:
+            views.pop(next(iter(views)))
+        views[key] = df if len(df) else None
+    return views[key]
+
+
+# -------------------------------
+# Multi-file queue: per-file progress and downloads
+# -------------------------------
+STATUS_LABELS = {
+    "queued": "Queued",
+    "waiting": "Waiting for a free slot",
+    "running": "Transcribing",
+    "done": "Done",
+    "failed": "Failed",
+    "cancelled": "Cancelled",
+}
+
+
+def file_queue_panel(queue, include_words, chunk_size, export_format="csv"):
+    running = queue.running
+
+    # Polls the background workers every second while any file is pending
+    @st.fragment(run_every=1.0 if running else None)
+    def panel():
+        for index, item in enumerate(queue.files):
+            col_name, col_progress, col_download = st.columns([4, 6, 2])
+            col_name.write(item.name)
+            label = STATUS_LABELS[item.status]
+            if item.status == "done" and item.cached:
+                label += " (cached)"
+            if item.error:
+                label += f": {item.error}"
+            col_progress.progress(min(item.progress, 1.0), text=label)
+            if item.transcript is not None:
+                # on_click="ignore" so a download does not rerun the page
+                extension, mime, _ = exports.FORMATS[export_format]
+                col_download.download_button(
+                    f"{extension.upper()} ⬇", data=queue.export(index, export_format, include_words, chunk_size),
+                    file_name=f"{item.stem}.{extension}", mime=mime,
+                    on_click="ignore", key=f"queue_export_{index}"
+                )
+
+        counts = queue.counts()
+        st.caption(" · ".join(f"{STATUS_LABELS[k]}: {v}" for k, v in counts.items()))
+        if not queue.running:
+            if counts.get("done"):
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+                st.download_button(
+                    "Download all (.zip) ⬇", data=queue.archive(export_format, include_words, chunk_size),
+                    file_name=f"transcriptions_{timestamp}.zip", mime="application/zip",
+                    on_click="ignore"
+                )
+            if running:
+                # Finished during this poll: rerun the page once to stop polling
+                st.rerun()
+
+    panel()
 
 
 # -------------------------------
@@ -177,21 +254,49 @@ def main():
     }  
     
     # Session state init
-    if "df" not in st.session_state:
-        st.session_state.df = None
+    if "transcript" not in st.session_state:
+        st.session_state.transcript = None
+    if "views" not in st.session_state:
+        st.session_state.views = {}
+    if "export_cache" not in st.session_state:
+        st.session_state.export_cache = exports.ExportCache()
     if "tmp_path" not in st.session_state:
         st.session_state.tmp_path = None
-    if "audio_path" not in st.session_state:
-        st.session_state.audio_path = None
-
-    uploaded_file = st.file_uploader("Upload Audio/Video File", type=[
+    if "file_hash" not in st.session_state:
+        st.session_state.file_hash = None
+    if "upload_seconds" not in st.session_state:
+        st.session_state.upload_seconds = None
+    if "diagnostics" not in st.session_state:
+        st.session_state.diagnostics = None
+    if "media_duration" not in st.session_state:
+        st.session_state.media_duration = None
+    if "queued_uploads" not in st.session_state:
+        st.session_state.queued_uploads = {}  # file_id -> (name, path, sha256, duration)
+    if "file_queue" not in st.session_state:
+        st.session_state.file_queue = None
+    if "started_uploads" not in st.session_state:
+        st.session_state.started_uploads = set()  # file_ids already handed to a queue
+
+    uploaded_files = st.file_uploader("Upload Audio/Video Files", type=[
         "mp4", "avi", "mkv", "mov", "wmv", "flv",
         "wav", "mp3", "aac", "ogg", "flac"
-    ])
-    model_size = st.selectbox("Model size", ["tiny", "base", "small", "medium", "large"], index=1)
+    ], accept_multiple_files=True) or []
+    # One file keeps the single-transcript view; several go through the queue
+    uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
+    multi = len(uploaded_files) > 1
+    model_size = st.selectbox("Model size", ["auto", "tiny", "base", "small", "medium", "large"], index=2)
+    compute_type = "int8"
+    deadline_minutes = None
+    if model_size == "auto":
+        # Most accurate model predicted to finish in time on this host
+        deadline_minutes = st.number_input(
+            "Finish within (minutes)",
+            min_value=1, max_value=24 * 60, value=30, step=5
+        )
     # Language selection (default = English)
 
-    selected_lang = st.selectbox("Select Language", list(lang.lang_map.keys()))
+    selected_lang = st.selectbox("Select Language", list(lang.lang_map.keys()),
+                                 index=list(lang.lang_map).index("English"))
     language = lang.lang_map[selected_lang]
 
 
@@ -203,15 +308,120 @@ def main():
         "Chunk size (number of words per row, set 0 to disable)",
         min_value=0, max_value=50, value=8, step=1
     )
-    chunk_size = None if chunk_size == 0 else chunk_size
+    # Finer limits, e.g. for subtitle-sized rows; all limits combine
+    with st.expander("Row limits"):
+        max_seconds = st.number_input("Max seconds per row (0 = no limit)", min_value=0.0, max_value=60.0,
+                                      value=0.0, step=0.5)
+        max_chars = st.number_input("Max characters per row (0 = no limit)", min_value=0, max_value=500,
+                                    value=0, step=1)
+        pause_seconds = st.number_input("New row after a pause of (seconds, 0 = off)", min_value=0.0,
+                                        max_value=10.0, value=0.0, step=0.1)
+        cross_segments = st.checkbox("Rows may span segment boundaries", value=False)
+    chunk_size = as_chunking(Chunking(
+        chunk_size or None, max_seconds or None, max_chars or None, pause_seconds or None, cross_segments
+    ))
+
+    export_format = st.selectbox(
+        "Download format", list(exports.FORMATS), format_func=lambda fmt: exports.FORMATS[fmt][2]
+    )
+
+    show_diagnostics = st.checkbox("Show diagnostics", value=False)
+
+    # Show segments as they are decoded
+    live = st.checkbox("Live preview while transcribing", value=True)
+
+    # Cut long silent or music-only stretches before decoding (opt-in, like the CLI and service)
+    trim = "vad" if st.checkbox("Skip silence and music before decoding", value=False) else None
+
+    # Inference engine
+    engines = {
+        "Standard": "standard",
+        "Long-file (parallel chunks)": "chunked",
+        "Batched (VAD)": "batched",
+    }
+    engine = engines[st.selectbox("Engine", list(engines.keys()))]
+    workers, window_minutes, batch_size = None, 5, 8
+    if engine == "batched":
+        batch_size = st.number_input(
+            "Batch size",
+            min_value=1, max_value=64, value=8, step=1
+        )
+    if engine == "chunked":
+        # Long recordings: split at silences and transcribe windows in parallel
+        col_workers, col_window = st.columns(2)
+        with col_workers:
+            workers = st.number_input(
+                "Parallel workers",
+                min_value=1, max_value=cpu_tuning.tuner.cores,
+                value=transcriber.default_workers(), step=1
+            )
+        with col_window:
+            window_minutes = st.number_input(
+                "Window length (minutes)",
+                min_value=1, max_value=30, value=5, step=1
+            )
+
+    parallel_files = 1
+    if multi:
+        # Files transcribed at once; they share one model with a replica each
+        parallel_files = st.number_input(
+            "Files in parallel",
+            min_value=1, max_value=len(uploaded_files),
+            value=min(len(uploaded_files), transcriber.default_workers()), step=1
+        )
 
     # Process upload
-    if uploaded_file is not None and st.session_state.tmp_path is None:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp:
-            tmp.write(uploaded_file.read())
-            st.session_state.tmp_path = tmp.name
+    # Files saved for the queue but not started yet are deleted as soon as they
+    # leave the uploader, including when a single file is left (that one goes
+    # through the single-transcript view). Started files belong to their queue,
+    # which deletes each one when it is done.
+    queued = st.session_state.queued_uploads
+    current = {f.file_id for f in uploaded_files} if multi else set()
+    for file_id in list(queued):
+        if file_id not in current:
+            path = queued.pop(file_id)[1]
+            if os.path.exists(path):
+                os.remove(path)
+    if multi:
+        for f in uploaded_files:
+            if f.file_id not in queued and f.file_id not in st.session_state.started_uploads:
+                f.seek(0)
+                path, content_hash = uploads.save_upload(f, suffix=os.path.splitext(f.name)[1])
+                queued[f.file_id] = (f.name, path, content_hash, pipeline.audio_duration(path))
+        if queued:
+            st.success(f"{len(queued)} files uploaded")
+    elif uploaded_file is not None and st.session_state.tmp_path is None:
+        # Copied in bounded chunks and hashed in the same pass
+        uploaded_file.seek(0)
+        started = time.perf_counter()
+        st.session_state.tmp_path, st.session_state.file_hash = uploads.save_upload(
+            uploaded_file, suffix=os.path.splitext(uploaded_file.name)[1]
+        )
+        st.session_state.upload_seconds = time.perf_counter() - started
+        st.session_state.media_duration = pipeline.audio_duration(st.session_state.tmp_path)
 
         st.success(f"File uploaded: {uploaded_file.name}")
+        if not pipeline.has_audio(st.session_state.tmp_path):
+            st.warning("⚠️ This file has no audio track; there is nothing to transcribe.")
+
+    if model_size == "auto":
+        duration = st.session_state.media_duration
+        if multi:
+            # The queue works through the files parallel_files at a time
+            duration = sum(d or 0 for *_, d in st.session_state.queued_uploads.values()) / parallel_files
+        choice = model_selection.choose(duration, deadline_minutes * 60, engine)
+        model_size, compute_type = choice["model_size"], choice["compute_type"]
+        if choice["predicted_seconds"] is None:
+            st.info(f"🤖 Auto: {model_size} ({compute_type}); upload a file to predict the run time.")
+        else:
+            finish = datetime.datetime.now() + datetime.timedelta(seconds=choice["predicted_seconds"])
+            st.info(
+                f"🤖 Auto: {model_size} ({compute_type}) · predicted "
+                f"{datetime.timedelta(seconds=round(choice['predicted_seconds']))}, done around {finish:%H:%M}"
+                + ("" if choice["measured"] else " · estimated, no runs measured on this host yet")
+            )
+            if not choice["fits"]:
+                st.warning("No model is predicted to finish within the deadline; using the fastest one.")
 
     # -------------------------------
     # Buttons row
@@ -226,72 +436,190 @@ def main():
     _, col2, col3 = st.columns([8, 4, 4])
     with col2:
         if st.button("Start Transcription", use_container_width=True):
-            st.session_state.start_transcription = True
+            if multi and st.session_state.queued_uploads:
+                queued = st.session_state.queued_uploads
+                st.session_state.file_queue = file_queue.FileQueue(
+                    [file_queue.QueuedFile(name, path, h) for name, path, h, _ in queued.values()],
+                    {
+                        "model_size": model_size, "compute_type": compute_type, "language": language,
+                        "engine": engine, "trim": trim, "window_seconds": window_minutes * 60,
+                        "batch_size": batch_size,
+                    },
+                    workers=parallel_files
+                )
+                # The queue deletes each temp file when that file is done
+                st.session_state.started_uploads |= set(queued)
+                st.session_state.queued_uploads = {}
+            elif not multi:
+                st.session_state.start_transcription = True
     with col3:
         if st.button("Clear All", use_container_width=True):
             st.session_state.start_transcription = False
-            if st.session_state.audio_path and os.path.exists(st.session_state.audio_path):
-                os.remove(st.session_state.audio_path)
             if st.session_state.tmp_path and os.path.exists(st.session_state.tmp_path):
                 os.remove(st.session_state.tmp_path)
-            st.session_state.df = None
+            st.session_state.transcript = None
+            st.session_state.views = {}
+            st.session_state.export_cache.clear()
             st.session_state.tmp_path = None
-            st.session_state.audio_path = None
+            st.session_state.file_hash = None
+            st.session_state.media_duration = None
+            if st.session_state.file_queue is not None:
+                st.session_state.file_queue.cancel()
+                st.session_state.file_queue = None
+            for _, path, _, _ in st.session_state.queued_uploads.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            st.session_state.queued_uploads = {}
+            st.session_state.started_uploads = set()
             st.rerun()
 
     # -------------------------------
     # Start transcription
     # -------------------------------
+    job = None
     if st.session_state.start_transcription and st.session_state.tmp_path:
-        with st.spinner("⏳ Preparing transcription..."):
-            ext = os.path.splitext(st.session_state.tmp_path)[1].lower()
-            video_exts = [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"]
-
-            if ext in video_exts:
-                st.session_state.audio_path = extract_audio_from_video(st.session_state.tmp_path)
-            else:
-                st.session_state.audio_path = st.session_state.tmp_path
+        # Per-stage timings, peak RSS and CPU for this job
+        if st.session_state.get("active_job") is not None:
+            # The previous run was interrupted before it could report
+            st.session_state.active_job.finish(status="aborted")
+        job = metrics.JobMetrics(source="streamlit", model=model_size, engine=engine).start()
+        st.session_state.active_job = job
+        if st.session_state.upload_seconds is not None:
+            job.add_stage("upload_write", st.session_state.upload_seconds)
+
+        cache_key = pipeline.cache_key(
+            st.session_state.file_hash, model_size, language, engine, compute_type=compute_type,
+            trim=trim, window_seconds=window_minutes * 60, batch_size=batch_size
+        )
+        with metrics.stage("cache_lookup"):
+            results = transcript_cache.get(cache_key)
 
-        if not st.session_state.audio_path:
-            st.error("No audio available for transcription.")
+        if results is not None:
+            st.info("♻️ Loaded cached transcription for this file and settings.")
         else:
-            with st.spinner("⏳ Transcription in progress..."):
-                results = transcribe_audio_with_timestamps(
-                    st.session_state.audio_path,
-                    model_size=model_size,
-                    language=language
-                )
-
-            if results:
-                formatted = format_transcription_for_csv(
-                    results,
-                    include_words=include_words,
-                    chunk_size=chunk_size
-                )
-                if formatted:
-                    st.session_state.df = pd.DataFrame(formatted)
+            with st.spinner("⏳ Preparing transcription..."):
+                if pipeline.is_video(st.session_state.tmp_path):
+                    audio = extract_audio_from_video(st.session_state.tmp_path)
                 else:
-                    st.warning("No transcription data found.")
+                    audio = st.session_state.tmp_path
 
+            if audio is None:
+                st.error("No audio available for transcription.")
+            else:
+                if engine == "chunked":
+                    # Windows finished before a failure or rerun are not decoded again
+                    committed = checkpoints.Checkpoint(cache_key).committed_seconds()
+                    if committed:
+                        st.info(
+                            f"⏯️ Resuming an interrupted run: "
+                            f"{datetime.timedelta(seconds=round(committed))} already transcribed"
+                        )
+                with st.spinner("⏳ Transcription in progress..."):
+                    results = transcribe_audio_with_timestamps(
+                        audio,
+                        model_size=model_size,
+                        compute_type=compute_type,
+                        language=language,
+                        engine=engine,
+                        workers=workers,
+                        window_seconds=window_minutes * 60,
+                        batch_size=batch_size,
+                        live=live,
+                        trim=trim,
+                        checkpoint_key=cache_key,
+                        content_hash=st.session_state.file_hash
+                    )
+
+                if results:
+                    transcript_cache.put(cache_key, results)
+                    stats = model_cache.cache_stats()
+                    st.caption(
+                        f"Model cache: {stats['hits']} hits, {stats['misses']} misses, "
+                        f"{stats['load_seconds']:.1f}s total load time"
+                    )
+
+        if results and results.get("language_detection"):
+            detection = results["language_detection"]
+            names = {code: name for name, code in lang.lang_map.items()}
+            st.info(
+                f"🌐 Detected language: {names.get(detection['language'], detection['language'])} "
+                f"({detection['probability']:.0%} confidence, {len(detection['samples'])} samples)"
+            )
+
+        if results and results.get("trim"):
+            report = results["trim"]
+            share = report["skipped_seconds"] / report["original_seconds"] if report["original_seconds"] else 0.0
+            st.caption(
+                f"✂️ Skipped {datetime.timedelta(seconds=round(report['skipped_seconds']))} of "
+                f"{datetime.timedelta(seconds=round(report['original_seconds']))} ({share:.0%}) "
+                f"as silence or non-speech"
+            )
+
+        if results:
+            # Keep the raw transcript in columnar form; table views are derived on demand
+            with metrics.stage("format"):
+                st.session_state.transcript = Transcript.from_results(results)
+            st.session_state.views = {}
+            st.session_state.export_cache.clear()
+
+        job_status = "ok" if results else "failed"
         st.session_state.start_transcription = False  # reset flag
 
+    if st.session_state.file_queue is not None:
+        file_queue_panel(st.session_state.file_queue, include_words, chunk_size, export_format)
+
     # -------------------------------
     # Show DataFrame if available
     # -------------------------------
-    if st.session_state.df is not None:
-        st.dataframe(st.session_state.df)
+    df = None
+    if st.session_state.transcript is not None:
+        df = transcript_view(include_words, chunk_size)
+        if df is None:
+            st.warning("No transcription data found.")
 
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"transcription_{timestamp}.csv"
+    if df is not None:
+        st.dataframe(df)
 
-        csv = st.session_state.df.to_csv(index=False, encoding="utf-8-sig")
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        extension, mime, _ = exports.FORMATS[export_format]
+        filename = f"transcription_{timestamp}.{extension}"
+
+        # Serialized once per view and format; reruns reuse the bytes
+        with metrics.stage("export"):
+            data = st.session_state.export_cache.get(
+                st.session_state.transcript, export_format, include_words, chunk_size
+            )
         st.download_button(
             "Download ⬇",
-            data=csv,
+            data=data,
             file_name=filename,
-            mime="text/csv"
+            mime=mime
         )
 
+    if job is not None:
+        st.session_state.diagnostics = job.finish(status=job_status)
+        st.session_state.active_job = None
+
+    if show_diagnostics and st.session_state.diagnostics:
+        import pandas as pd
+        diag = st.session_state.diagnostics
+        with st.expander("Diagnostics", expanded=True):
+            st.table(pd.DataFrame(
+                list(diag["stages"].items()), columns=["stage", "seconds"]
+            ))
+            rtf = diag["real_time_factor"]
+            st.write(
+                f"Wall time: {diag['wall_seconds']:.2f}s · "
+                f"Real-time factor: {rtf if rtf is not None else 'n/a'} · "
+                f"Peak RSS: {diag['peak_rss_mb']} MB · "
+                f"Avg CPU cores: {diag['avg_cpu_cores']}"
+            )
+            if diag.get("cpu_threads"):
+                st.write(
+                    f"CPU threads: {diag['cpu_threads']} × {diag['num_workers']} worker(s) · "
+                    f"{cpu_tuning.tuner.stats()['cores']} usable cores"
+                )
+
     # Footer
     st.write("---")
     # Copyright (centered)
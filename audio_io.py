@@ -0,0 +1,127 @@
+import os
+import tempfile
+
+import av
+import numpy as np
+
+# ==============================
+# In-memory audio decoding
+# ==============================
+# Decodes the audio track of any container PyAV can open straight into a
+# 16 kHz mono float32 buffer, the format faster-whisper consumes, without
+# writing an intermediate WAV. Only the audio stream is demuxed: the demuxer
+# is told to discard every other stream, so video packets are skipped rather
+# than read and thrown away, and video is never decoded. 16 kHz mono PCM
+# tracks are copied out of their packets without going through a decoder.
+
+SAMPLE_RATE = 16000
+
+# Longer inputs are decoded into a memory-mapped temp file instead of RAM.
+MMAP_OVER_SECONDS = float(os.environ.get("AUDIO_MMAP_OVER_SECONDS", "3600"))
+# Decoded frames are resampled in groups of this many samples: one resampler
+# call per 20 ms Opus/AAC frame costs more than the decode itself.
+RESAMPLE_GROUP_SAMPLES = 500000
+
+# Older PyAV releases cannot set a stream's discard level; they still work,
+# only without the skipped reads.
+_DISCARD_ALL = getattr(getattr(av.stream, "Discard", None), "all", None)
+
+
+def _stream_duration(container, stream):
+    if stream.duration is not None and stream.time_base is not None:
+        return float(stream.duration * stream.time_base)
+    if container.duration is not None:
+        return container.duration / av.time_base
+    return None
+
+
+def has_audio(path):
+    # Answered from the container header; no packet is demuxed or decoded.
+    with av.open(path, metadata_errors="ignore") as container:
+        return bool(container.streams.audio)
+
+
+def probe_duration(path):
+    with av.open(path, metadata_errors="ignore") as container:
+        if not container.streams.audio:
+            return None
+        return _stream_duration(container, container.streams.audio[0])
+
+
+def _allocate(n_samples, use_mmap):
+    if use_mmap:
+        # Anonymous (already unlinked) file: the mapping keeps it alive and the
+        # OS reclaims the space as soon as the array is garbage-collected.
+        return np.memmap(tempfile.TemporaryFile(), dtype=np.float32, mode="w+", shape=(n_samples,))
+    return np.empty(n_samples, dtype=np.float32)
+
+
+def _grow(buffer, n_samples, use_mmap):
+    grown = _allocate(n_samples, use_mmap)
+    grown[: len(buffer)] = buffer
+    return grown
+
+
+def decode_audio(path, sampling_rate=SAMPLE_RATE, mmap_over_seconds=MMAP_OVER_SECONDS, logger=None):
+    # Returns None when the container has no audio track. `logger` is an
+    # optional proglog logger, the same progress protocol moviepy uses.
+    with av.open(path, metadata_errors="ignore") as container:
+        if not container.streams.audio:
+            return None
+        stream = container.streams.audio[0]
+        stream.thread_type = "AUTO"
+        if _DISCARD_ALL is not None:
+            for other in container.streams:
+                if other.index != stream.index:
+                    other.discard = _DISCARD_ALL
+
+        duration = _stream_duration(container, stream)
+        use_mmap = duration is not None and duration > mmap_over_seconds
+        # Metadata durations are approximate; leave some headroom.
+        capacity = int((duration or 60) * sampling_rate * 1.01) + sampling_rate
+        buffer = _allocate(capacity, use_mmap)
+        written = 0
+
+        # Same resampling as faster_whisper.decode_audio, so the model sees identical input.
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=sampling_rate)
+        total_ms = int(duration * 1000) if duration else None
+        if logger is not None and total_ms:
+            logger(chunk__total=total_ms)
+
+        def append(samples):
+            nonlocal buffer, capacity, written
+            if written + len(samples) > capacity:
+                capacity = max(capacity * 2, written + len(samples))
+                buffer = _grow(buffer[:written], capacity, use_mmap)
+            # Convert int16 -> float32 in place, without a temporary copy.
+            out = buffer[written: written + len(samples)]
+            out[:] = samples
+            out *= 1 / 32768.0
+            written += len(samples)
+            if logger is not None and total_ms:
+                logger(chunk__index=min(written * 1000 // sampling_rate, total_ms))
+
+        codec = stream.codec_context
+        if (codec.name == "pcm_s16le" and codec.sample_rate == sampling_rate
+                and len(codec.layout.channels) == 1):
+            # Already the model's sample format: no decoder, no resampler.
+            for packet in container.demux(stream):
+                if packet.size:
+                    append(np.frombuffer(packet, dtype="<i2"))
+        else:
+            fifo = av.AudioFifo()
+
+            def resample(frame):
+                for out_frame in resampler.resample(frame):
+                    append(out_frame.to_ndarray().reshape(-1))
+
+            for frame in container.decode(stream):
+                frame.pts = None  # the fifo rejects the gaps some muxers leave
+                fifo.write(frame)
+                if fifo.samples >= RESAMPLE_GROUP_SAMPLES:
+                    resample(fifo.read())
+            if fifo.samples:
+                resample(fifo.read())
+            resample(None)
+
+    return buffer[:written]
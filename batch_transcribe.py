@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import cpu_tuning
+import exports
+import language_detection
+import pipeline
+import transcript_cache
+from transcript import Chunking, Transcript, as_chunking
+
+# ==============================
+# Headless batch transcription
+# ==============================
+# Usage:
+#   python batch_transcribe.py media_dir/ --output-dir out/ --workers 4
+#   python batch_transcribe.py manifest.txt --output-dir out/   (one path per line)
+
+
+def collect_inputs(source):
+    # Returns (path, relative output stem) pairs for a directory or a manifest.
+    if os.path.isdir(source):
+        inputs = []
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in pipeline.MEDIA_EXTS:
+                    path = os.path.join(root, name)
+                    inputs.append((path, os.path.splitext(os.path.relpath(path, source))[0]))
+        inputs.sort()
+    else:
+        paths = []
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                path = line.strip()
+                if path and not path.startswith("#") and path not in paths:
+                    paths.append(path)
+        # Stems keep the paths below the manifest's common directory, the way
+        # directory mode keeps them below the source, so /a/rec.mp4 and
+        # /b/rec.mp4 go to a/rec.* and b/rec.*.
+        dirs = [os.path.dirname(os.path.abspath(path)) for path in paths]
+        root = os.path.commonpath(dirs) if dirs else ""
+        inputs = [
+            (path, os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0]) for path in paths
+        ]
+
+    # Files differing only by extension would still overwrite each other.
+    seen = {}
+    for path, stem in inputs:
+        if stem in seen:
+            raise ValueError(f"{seen[stem]} and {path} would both be written as {stem}.*")
+        seen[stem] = path
+    return inputs
+
+
+def _write_atomic(path, write):
+    # A crash never leaves a partial output that a rerun would skip.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def output_paths(output_dir, stem, formats):
+    return {fmt: os.path.join(output_dir, f"{stem}.{fmt}") for fmt in formats}
+
+
+def process_file(path, stem, args):
+    audio = pipeline.load_audio(path)
+    if audio is None:
+        raise ValueError("no audio track")
+    duration = pipeline.audio_duration(audio) or 0.0
+
+    # All workers share one model, built with the host's thread plan.
+    results = pipeline.transcribe_audio(
+        audio, model_size=args.model, language=args.language, engine=args.engine,
+        batch_size=args.batch_size, trim=args.trim,
+        content_hash=transcript_cache.hash_file(path) if args.language == language_detection.AUTO else None
+    )
+
+    outputs = output_paths(args.output_dir, stem, args.formats)
+    if "json" in outputs:
+        def write_json(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False)
+        _write_atomic(outputs["json"], write_json)
+    transcript = Transcript.from_results(results)
+    for fmt, out_path in outputs.items():
+        if fmt in exports.WRITERS:
+            # Streamed to disk a batch of rows at a time
+            _write_atomic(out_path, lambda tmp_path, fmt=fmt: exports.write_file(
+                tmp_path, transcript, fmt, include_words=args.include_words, chunk_size=args.chunk_size
+            ))
+    return duration
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe a directory or manifest of media files")
+    parser.add_argument("source", help="directory to walk, or a text file with one media path per line")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--model", default="base", choices=["tiny", "base", "small", "medium", "large"])
+    parser.add_argument("--language", default=None,
+                        help="language code, e.g. en, or auto to detect it from samples across each file "
+                             "(default: the model detects it from the first 30 seconds)")
+    parser.add_argument("--engine", default="standard", choices=["standard", "batched"])
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--trim", choices=["energy", "vad"], default=None,
+                        help="skip silence (energy) or silence and non-speech (vad) before decoding")
+    parser.add_argument("--workers", type=int, default=cpu_tuning.tuner.default_workers())
+    parser.add_argument("--formats", nargs="+", default=["csv", "json"], choices=["json", *exports.WRITERS])
+    parser.add_argument("--include-words", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=8, help="words per row, 0 to disable")
+    parser.add_argument("--max-seconds", type=float, default=None, help="longest row, in seconds")
+    parser.add_argument("--max-chars", type=int, default=None, help="longest row, in characters")
+    parser.add_argument("--pause", type=float, default=None, help="start a new row after a pause this long")
+    parser.add_argument("--cross-segments", action="store_true", help="let rows span segment boundaries")
+    args = parser.parse_args(argv)
+    args.chunk_size = as_chunking(Chunking(
+        args.chunk_size or None, args.max_seconds, args.max_chars, args.pause, args.cross_segments
+    ))
+
+    try:
+        inputs = collect_inputs(args.source)
+    except ValueError as e:
+        parser.error(str(e))
+    pending = [
+        (path, stem) for path, stem in inputs
+        if not all(os.path.exists(p) for p in output_paths(args.output_dir, stem, args.formats).values())
+    ]
+    print(f"{len(inputs)} files, {len(inputs) - len(pending)} already done, {len(pending)} to process")
+
+    done, failed, audio_seconds = 0, 0, 0.0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(process_file, path, stem, args): path for path, stem in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                duration = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"FAILED {path}: {e}", file=sys.stderr)
+                continue
+            done += 1
+            audio_seconds += duration
+            print(f"[{done + failed}/{len(pending)}] {path} ({duration:.0f}s audio)")
+
+    elapsed = time.perf_counter() - start
+    files_per_hour = done / elapsed * 3600 if elapsed > 0 else 0.0
+    rtf = elapsed / audio_seconds if audio_seconds > 0 else 0.0
+    print(
+        f"Processed {done} files ({audio_seconds / 3600:.2f} h audio) in {elapsed:.1f}s, "
+        f"{failed} failed: {files_per_hour:.1f} files/hour, real-time factor {rtf:.3f}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
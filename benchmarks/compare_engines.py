@@ -0,0 +1,80 @@
+import argparse
+import json
+import time
+
+from faster_whisper import decode_audio
+
+import model_cache
+import transcriber
+
+# ==============================
+# Standard vs batched engine: speed and agreement
+# ==============================
+# Usage: python -m benchmarks.compare_engines recording.wav --model base [--reference ref.txt]
+
+
+def word_error_rate(reference, hypothesis):
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    # Single-row Levenshtein distance over words.
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1] / len(ref)
+
+
+def transcript_text(results):
+    return " ".join(segment["text"] for segment in results["segments"])
+
+
+def run_engine(engine, model, audio, language, batch_size):
+    start = time.perf_counter()
+    if engine == "batched":
+        results = transcriber.transcribe_batched(model, audio, language=language, batch_size=batch_size)
+    else:
+        results = transcriber.transcribe(model, audio, language=language)
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the standard and batched engines")
+    parser.add_argument("audio")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--language", default=None)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--reference", help="plain-text reference transcript")
+    args = parser.parse_args()
+
+    audio = decode_audio(args.audio, sampling_rate=transcriber.SAMPLE_RATE)
+    duration = len(audio) / transcriber.SAMPLE_RATE
+    model = model_cache.get_model(args.model, device="cpu", compute_type="int8")
+    reference = open(args.reference, encoding="utf-8").read() if args.reference else None
+
+    report = {"audio_seconds": duration, "model": args.model, "engines": {}}
+    texts = {}
+    for engine in ("standard", "batched"):
+        results, elapsed = run_engine(engine, model, audio, args.language, args.batch_size)
+        texts[engine] = transcript_text(results)
+        entry = {
+            "seconds": round(elapsed, 3),
+            "real_time_factor": round(elapsed / duration, 4),
+            "segments": len(results["segments"]),
+        }
+        if reference is not None:
+            entry["wer"] = round(word_error_rate(reference, texts[engine]), 4)
+        report["engines"][engine] = entry
+
+    report["speedup"] = round(
+        report["engines"]["standard"]["seconds"] / report["engines"]["batched"]["seconds"], 2
+    )
+    # Without a reference, the standard engine's output is the yardstick.
+    report["batched_vs_standard_wer"] = round(word_error_rate(texts["standard"], texts["batched"]), 4)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
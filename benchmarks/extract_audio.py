@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import av
+import numpy as np
+
+import audio_io
+from benchmarks.fixtures import CONTAINERS, fixture
+
+# ==============================
+# Audio extraction from video containers
+# ==============================
+# Times getting model-ready samples out of MP4/MKV/MOV recordings three ways:
+#   audio_io         what the app does: demux only the audio stream, decode once
+#                    (PCM tracks are copied without a decoder)
+#   all_streams      faster_whisper.decode_audio: decode once, but every
+#                    stream's packets are read
+#   wav_roundtrip    the old extract-to-WAV path: decode, encode a 44.1 kHz
+#                    WAV, decode that again
+# and how long the "no audio track" answer takes from the container header.
+#
+# Usage:
+#   python -m benchmarks.extract_audio
+#   python -m benchmarks.extract_audio --seconds 600 --runs 5 --output extract.json
+
+
+def all_streams(path):
+    from faster_whisper import decode_audio
+    return decode_audio(path, sampling_rate=audio_io.SAMPLE_RATE)
+
+
+def wav_roundtrip(path):
+    from faster_whisper import decode_audio
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "audio.wav")
+        with av.open(path, metadata_errors="ignore") as source, av.open(wav_path, "w") as target:
+            out = target.add_stream("pcm_s16le", rate=44100)
+            out.layout = "stereo"
+            resampler = av.AudioResampler(format="s16", layout="stereo", rate=44100)
+            for frame in source.decode(audio=0):
+                for resampled in resampler.resample(frame):
+                    target.mux(out.encode(resampled))
+            target.mux(out.encode())
+        return decode_audio(wav_path, sampling_rate=audio_io.SAMPLE_RATE)
+
+
+METHODS = {"audio_io": audio_io.decode_audio, "all_streams": all_streams, "wav_roundtrip": wav_roundtrip}
+
+
+def timed(fn, path, runs):
+    samples, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn(path)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audio extraction benchmark")
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--containers", nargs="+", default=list(CONTAINERS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="also write the report as JSON here")
+    args = parser.parse_args(argv)
+
+    report = {"seconds": args.seconds, "cases": []}
+    for kind in args.containers:
+        for heavy_video in (False, True):
+            path = fixture(args.seconds, kind, heavy_video=heavy_video)
+            case = {"container": kind, "audio_codec": CONTAINERS[kind][1], "heavy_video": heavy_video,
+                    "file_mb": round(os.path.getsize(path) / 2 ** 20, 1)}
+            reference = None
+            for name, fn in METHODS.items():
+                seconds, audio = timed(fn, path, args.runs)
+                case[f"{name}_seconds"] = round(seconds, 4)
+                if name == "audio_io":
+                    reference = audio
+                elif name == "all_streams":
+                    # Same decoder and resampler: the samples must be identical.
+                    case["identical_to_all_streams"] = bool(np.array_equal(reference, audio))
+            case["speedup_vs_all_streams"] = round(case["all_streams_seconds"] / case["audio_io_seconds"], 2)
+            case["speedup_vs_wav_roundtrip"] = round(case["wav_roundtrip_seconds"] / case["audio_io_seconds"], 2)
+            report["cases"].append(case)
+            print(json.dumps(case))
+
+    silent = fixture(args.seconds, "mp4", heavy_video=True, audio=False)
+    header_seconds, found = timed(audio_io.has_audio, silent, args.runs)
+    report["no_audio"] = {"file_mb": round(os.path.getsize(silent) / 2 ** 20, 1),
+                          "has_audio": found, "header_seconds": round(header_seconds, 5)}
+    print(json.dumps(report["no_audio"]))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import os
+import wave
+from fractions import Fraction
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# ==============================
+# Deterministic speech-like test media
+# ==============================
+# Voiced "syllables" (a gliding harmonic series shaped by two formant bands)
+# grouped into words and sentences, separated by pauses, over a low noise
+# floor. The same seed and length always give the same samples, so timings
+# are comparable across runs and machines.
+
+
+def speech_like(seconds, seed=0, sampling_rate=SAMPLE_RATE):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sampling_rate)
+    audio = rng.normal(0, 0.002, n).astype(np.float32)
+    pos = int(0.3 * sampling_rate)
+    while pos < n:
+        for _ in range(rng.integers(3, 12)):                     # words per sentence
+            for _ in range(rng.integers(1, 4)):                  # syllables per word
+                length = int(rng.uniform(0.12, 0.28) * sampling_rate)
+                if pos + length > n:
+                    return audio
+                t = np.arange(length) / sampling_rate
+                f0 = rng.uniform(100, 220) * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(2, 5) * t))
+                phase = 2 * np.pi * np.cumsum(f0) / sampling_rate
+                formants = rng.uniform(300, 900), rng.uniform(900, 2500)
+                syllable = np.zeros(length)
+                for k in range(1, 16):
+                    gain = sum(np.exp(-((k * f0 - f) / 250) ** 2) for f in formants) / k
+                    syllable += gain * np.sin(k * phase)
+                syllable *= np.hanning(length)
+                audio[pos: pos + length] += (0.3 * syllable / (np.abs(syllable).max() + 1e-9)).astype(np.float32)
+                pos += length + int(rng.uniform(0.01, 0.05) * sampling_rate)
+            pos += int(rng.uniform(0.08, 0.25) * sampling_rate)   # between words
+        pos += int(rng.uniform(0.5, 1.5) * sampling_rate)         # between sentences
+    return audio
+
+
+def write_wav(path, audio, sampling_rate=SAMPLE_RATE):
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sampling_rate)
+        f.writeframes(pcm.tobytes())
+
+
+# Containers the extraction benchmark covers, with the codecs typical of each.
+CONTAINERS = {
+    "mp4": ("mpeg4", "aac"),
+    "mkv": ("mpeg4", "libopus"),
+    "mov": ("mpeg4", "pcm_s16le"),
+}
+
+
+def write_video(path, audio, sampling_rate=SAMPLE_RATE, fps=5, size=64,
+                video_codec="mpeg4", audio_codec="aac", noise=False, seconds=None):
+    # A tiny black video stream muxed with `audio`, enough to exercise the
+    # demux/decode path of real recordings. noise=True fills the frames with
+    # incompressible noise, so the video stream outweighs the audio as in a
+    # real recording; audio_codec=None writes a video without an audio track.
+    import av
+    rng = np.random.default_rng(0)
+    seconds = len(audio) / sampling_rate if seconds is None else seconds
+    container = av.open(path, "w")
+    try:
+        video = container.add_stream(video_codec, rate=fps)
+        video.width = video.height = size
+        video.pix_fmt = "yuv420p"
+        sound = None
+        if audio_codec is not None:
+            sound = container.add_stream(audio_codec, rate=sampling_rate)
+            sound.layout = "mono"
+
+        frame = av.VideoFrame.from_ndarray(np.zeros((size, size, 3), dtype=np.uint8), format="rgb24")
+        for i in range(int(seconds * fps)):
+            if noise:
+                frame = av.VideoFrame.from_ndarray(
+                    rng.integers(0, 256, (size, size, 3), dtype=np.uint8), format="rgb24"
+                )
+            frame.pts = i
+            frame.time_base = Fraction(1, fps)
+            container.mux(video.encode(frame))
+        container.mux(video.encode())
+        if sound is None:
+            return
+
+        pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+        block = 1024
+        for offset in range(0, len(pcm), block):
+            chunk = av.AudioFrame.from_ndarray(pcm[None, offset: offset + block], format="s16", layout="mono")
+            chunk.sample_rate = sampling_rate
+            chunk.pts = offset
+            container.mux(sound.encode(chunk))
+        container.mux(sound.encode())
+    finally:
+        container.close()
+
+
+def fixture(seconds, kind="wav", seed=0, heavy_video=False, audio=True):
+    # Generated once per length and kind, then reused from FIXTURE_DIR. Video
+    # kinds are the CONTAINERS keys; heavy_video and audio=False as in write_video.
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    variant = ("_heavy" if heavy_video else "") + ("" if audio else "_noaudio")
+    path = os.path.join(FIXTURE_DIR, f"speech_{int(seconds)}s_seed{seed}{variant}.{kind}")
+    if not os.path.exists(path):
+        tmp = path + ".part." + kind
+        samples = speech_like(seconds, seed=seed)
+        if kind == "wav":
+            write_wav(tmp, samples)
+        else:
+            video_codec, audio_codec = CONTAINERS.get(kind, CONTAINERS["mp4"])
+            write_video(tmp, samples, video_codec=video_codec, audio_codec=audio_codec if audio else None,
+                        noise=heavy_video, size=320 if heavy_video else 64)
+        os.replace(tmp, path)
+    return path
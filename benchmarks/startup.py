@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# ==============================
+# Page startup time
+# ==============================
+# Each sample is a fresh interpreter that renders a page once (cold: every
+# import is paid) and then reruns it (what each widget interaction costs).
+# --compare REF renders the same pages from a git worktree of REF, for a
+# before/after table.
+#
+# Usage:
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --compare HEAD~1 --runs 5
+
+PAGES = ["Home.py", "pages/1_About.py", "pages/3_Privacy_Policy.py"]
+
+SAMPLE = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t0 = time.perf_counter()
+at.run()
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+if at.exception:
+    raise SystemExit(str(at.exception[0].value))
+print(json.dumps({
+    "first_render_seconds": t1 - started,
+    "rerun_seconds": t2 - t1,
+    "modules": len(sys.modules),
+    "heavy_modules": sorted(m for m in ("faster_whisper", "pandas", "pyarrow", "moviepy", "ctranslate2")
+                            if m in sys.modules),
+}))
+"""
+
+
+def measure(repo, page, runs):
+    env = {**os.environ, "METRICS_PORT": "0", "PREWARM_MODEL": "", "PYTHONPATH": repo}
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", SAMPLE, page], cwd=repo, env=env,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{page} in {repo}: {proc.stderr.strip().splitlines()[-1]}")
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {
+        "first_render_seconds": round(statistics.median(s["first_render_seconds"] for s in samples), 3),
+        "rerun_seconds": round(statistics.median(s["rerun_seconds"] for s in samples), 4),
+        "modules": samples[-1]["modules"],
+        "heavy_modules": samples[-1]["heavy_modules"],
+    }
+
+
+def measure_tree(repo, runs):
+    return {page: measure(repo, page, runs) for page in PAGES if os.path.exists(os.path.join(repo, page))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit page startup benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--compare", metavar="REF", help="git revision to measure as 'before'")
+    args = parser.parse_args(argv)
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    report = {"after": measure_tree(repo, args.runs)}
+    if args.compare:
+        worktree = tempfile.mkdtemp(prefix="startup-bench-")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, args.compare],
+                       cwd=repo, check=True, capture_output=True)
+        try:
+            report["before"] = measure_tree(worktree, args.runs)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=repo, capture_output=True)
+            shutil.rmtree(worktree, ignore_errors=True)
+        report["speedup"] = {
+            page: round(report["before"][page]["first_render_seconds"] / after["first_render_seconds"], 2)
+            for page, after in report["after"].items() if page in report["before"]
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import metrics
+import pipeline
+from benchmarks import fixtures
+
+# ==============================
+# Throughput and memory benchmark suite
+# ==============================
+# Each case runs in a fresh interpreter so model load time is cold and peak
+# RSS belongs to that case alone. Results are written as JSON and compared
+# with a stored baseline; any metric that got worse beyond its tolerance is
+# reported and the exit status is 1.
+#
+# Usage:
+#   python -m benchmarks.throughput --output results.json
+#   python -m benchmarks.throughput --models tiny base --compute-types int8 --lengths 30
+#   python -m benchmarks.throughput --update-baseline      # after a deliberate change
+#
+# Baselines are machine specific: record one on the deploy hardware.
+
+MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+LENGTHS = [30, 120, 600]
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Relative slack per metric, plus an absolute floor so tiny values don't flap.
+TOLERANCES = {
+    "wall_seconds": (0.15, 0.5),
+    "real_time_factor": (0.15, 0.01),
+    "model_load_seconds": (0.25, 0.5),
+    "peak_rss_mb": (0.10, 32.0),
+}
+
+
+# -------------------------------
+# Single case (runs in the child process)
+# -------------------------------
+def run_case(case):
+    kind, seconds = case["kind"], case["seconds"]
+    path = fixtures.fixture(seconds, kind="mp4" if kind == "extract" else "wav")
+    metrics.logger.setLevel("WARNING")
+    job = metrics.JobMetrics(source="benchmark").start()
+    if kind == "extract":
+        audio = pipeline.load_audio(path)
+        job.audio_seconds = pipeline.audio_duration(audio)
+    else:
+        # Same call Home.transcribe_audio_with_timestamps makes, minus the UI;
+        # speeds on synthetic audio would mislead the "auto" model choice.
+        pipeline.transcribe_audio(path, model_size=case["model"], compute_type=case["compute_type"],
+                                  record_rtf=False)
+    summary = job.finish()
+    return {
+        **case,
+        "wall_seconds": summary["wall_seconds"],
+        "real_time_factor": summary["real_time_factor"],
+        "model_load_seconds": summary["stages"].get("model_load"),
+        "peak_rss_mb": summary["peak_rss_mb"],
+        "stages": summary["stages"],
+    }
+
+
+def case_id(case):
+    if case["kind"] == "extract":
+        return f"extract/{case['seconds']}s"
+    return f"transcribe/{case['model']}/{case['compute_type']}/{case['seconds']}s"
+
+
+def run_isolated(case):
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.throughput", "--case", json.dumps(case)],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {**case, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# -------------------------------
+# Baseline comparison
+# -------------------------------
+def environment():
+    try:
+        import ctranslate2
+        ct2 = ctranslate2.__version__
+    except ImportError:
+        ct2 = None
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "ctranslate2": ct2,
+    }
+
+
+def compare(results, baseline):
+    regressions = []
+    previous = {r["id"]: r for r in baseline.get("results", [])}
+    for result in results:
+        before = previous.get(result["id"])
+        if before is None or "error" in before:
+            continue
+        if "error" in result:
+            regressions.append({"id": result["id"], "metric": "error", "baseline": None, "current": result["error"]})
+            continue
+        for name, (relative, absolute) in TOLERANCES.items():
+            old, new = before.get(name), result.get(name)
+            if old is None or new is None:
+                continue
+            if new > max(old * (1 + relative), old + absolute):
+                regressions.append({"id": result["id"], "metric": name, "baseline": old, "current": new})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcription throughput and memory benchmarks")
+    parser.add_argument("--models", nargs="+", default=MODEL_SIZES)
+    parser.add_argument("--compute-types", nargs="+", default=COMPUTE_TYPES)
+    parser.add_argument("--lengths", nargs="+", type=int, default=LENGTHS, help="audio lengths in seconds")
+    parser.add_argument("--skip-extract", action="store_true", help="skip the video-extraction cases")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return 0
+
+    cases = []
+    if not args.skip_extract:
+        cases += [{"kind": "extract", "seconds": s} for s in args.lengths]
+    cases += [
+        {"kind": "transcribe", "model": m, "compute_type": c, "seconds": s}
+        for m in args.models for c in args.compute_types for s in args.lengths
+    ]
+    results = []
+    for case in cases:
+        result = {"id": case_id(case), **run_isolated(case)}
+        results.append(result)
+        print(f"{result['id']}: " + (result.get("error") or
+              f"{result['wall_seconds']:.2f}s, RTF {result['real_time_factor']}, {result['peak_rss_mb']} MB"),
+              file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != report["environment"]:
+            print("warning: baseline was recorded on a different environment", file=sys.stderr)
+        report["regressions"] = compare(results, baseline)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
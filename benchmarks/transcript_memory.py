@@ -0,0 +1,117 @@
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+import exports
+from transcript import Chunking, Transcript
+
+# ==============================
+# Nested-dict results vs columnar Transcript: memory and build time
+# ==============================
+# Usage: python -m benchmarks.transcript_memory --words 1000000 --chunk-size 8
+
+VOCAB = ["the", "meeting", "starts", "now", "okay", "so", "budget", "we", "agreed", "next"]
+
+
+def synthetic_results(n_words, words_per_segment=20, seed=0):
+    rng = random.Random(seed)
+    segments = []
+    t = 0.0
+    for first in range(0, n_words, words_per_segment):
+        words = []
+        for _ in range(min(words_per_segment, n_words - first)):
+            duration = rng.uniform(0.15, 0.6)
+            words.append({"start": round(t, 2), "end": round(t + duration, 2), "text": rng.choice(VOCAB)})
+            t += duration + rng.uniform(0.0, 0.3)
+        segments.append({
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+            "text": " ".join(w["text"] for w in words),
+            "words": words,
+        })
+    return {"language": "en", "segments": segments}
+
+
+def legacy_format(transcription_results, include_words=False, chunk_size=None):
+    # format_transcription_for_csv as it was before Transcript: one dict per
+    # row, built by walking the nested results. Kept here as the baseline,
+    # since the app's version now goes through Transcript.
+    formatted_data = []
+    if transcription_results and "segments" in transcription_results:
+        for segment in transcription_results["segments"]:
+            words = segment.get("words", [])
+            if chunk_size and words:
+                for i in range(0, len(words), chunk_size):
+                    chunk = words[i:i + chunk_size]
+                    formatted_data.append({
+                        "start_time": chunk[0]["start"],
+                        "end_time": chunk[-1]["end"],
+                        "text": " ".join([w["text"] for w in chunk]),
+                    })
+            elif include_words and words:
+                for w in words:
+                    formatted_data.append({"start_time": w["start"], "end_time": w["end"], "text": w["text"]})
+            else:
+                formatted_data.append({
+                    "start_time": segment["start"],
+                    "end_time": segment["end"],
+                    "text": segment["text"].strip(),
+                })
+    return formatted_data
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, {"seconds": round(elapsed, 3), "retained_mb": round(current / 2**20, 1), "peak_mb": round(peak / 2**20, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcript representation memory benchmark")
+    parser.add_argument("--words", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=8)
+    args = parser.parse_args()
+
+    report = {"words": args.words, "chunk_size": args.chunk_size}
+    results, report["results_dict"] = measure(lambda: synthetic_results(args.words))
+
+    _, report["dict_view_dataframe"] = measure(
+        lambda: pd.DataFrame(legacy_format(results, chunk_size=args.chunk_size))
+    )
+    transcript, report["transcript_from_results"] = measure(lambda: Transcript.from_results(results))
+    report["transcript_nbytes_mb"] = round(transcript.nbytes / 2**20, 1)
+
+    del results
+    _, report["transcript_view_dataframe"] = measure(
+        lambda: transcript.to_dataframe(chunk_size=args.chunk_size)
+    )
+    _, report["transcript_word_view_dataframe"] = measure(
+        lambda: transcript.to_dataframe(include_words=True)
+    )
+    _, report["transcript_subtitle_rows"] = measure(
+        lambda: transcript.rows(chunk_size=Chunking(seconds=6, chars=42, pause=0.8, cross_segments=True))
+    )
+
+    # Exports: one big string from the table vs the streamed writers
+    _, report["dataframe_to_csv"] = measure(
+        lambda: transcript.to_dataframe(chunk_size=args.chunk_size).to_csv(index=False)
+    )
+    for fmt in exports.WRITERS:
+        _, report[f"streamed_{fmt}"] = measure(
+            lambda: sum(len(c) for c in exports.export_chunks(transcript, fmt, chunk_size=args.chunk_size))
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
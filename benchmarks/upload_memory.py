@@ -0,0 +1,71 @@
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import uploads
+
+# ==============================
+# Peak memory of saving a large upload
+# ==============================
+# Usage: python -m benchmarks.upload_memory --size-mb 1024
+
+
+class SyntheticUpload(io.RawIOBase):
+    # Produces `size` bytes on demand, so the source itself costs no memory.
+    def __init__(self, size):
+        self.size = size
+        self.pos = 0
+        self.block = os.urandom(64 * 1024)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.size - self.pos)
+        for offset in range(0, n, len(self.block)):
+            piece = self.block[: min(len(self.block), n - offset)]
+            buffer[offset: offset + len(piece)] = piece
+        self.pos += n
+        return n
+
+
+def read_all(src, suffix):
+    # The previous behaviour: tmp.write(uploaded_file.read())
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(src.read())
+    return tmp.name
+
+
+def measure(save, size):
+    tracemalloc.start()
+    path = save(SyntheticUpload(size))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    os.remove(path)
+    return round(peak / 2**20, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload handling peak-memory benchmark")
+    parser.add_argument("--size-mb", type=int, default=1024)
+    args = parser.parse_args()
+    size = args.size_mb * 2**20
+
+    report = {
+        "upload_mb": args.size_mb,
+        "read_all_peak_mb": measure(lambda src: read_all(src, ".bin"), size),
+        "chunked_peak_mb": measure(lambda src: uploads.save_upload(src, ".bin")[0], size),
+    }
+    # Chunked copying must stay bounded regardless of the upload size.
+    report["chunked_bounded"] = report["chunked_peak_mb"] < 8 * uploads.COPY_CHUNK / 2**20
+    print(json.dumps(report, indent=2))
+    # Non-zero exit, so a regression fails CI runs of the benchmark.
+    return 0 if report["chunked_bounded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: exclusive-create lock files instead
+    fcntl = None
+
+# ==============================
+# Resumable transcription checkpoints
+# ==============================
+# The long-file engine transcribes independent silence-aligned windows, so
+# a finished window never changes. Each one is appended to a JSON-lines file
+# keyed like the transcript cache (content hash + settings) as soon as it is
+# done; an interrupted job reloads the window plan and the finished windows
+# and only decodes the rest. A line torn by a crash is cut off on load.
+#
+# Two jobs on the same content and settings share a key, so a job must hold
+# the key's lock (acquire) before it writes; a job that cannot get it runs
+# without a checkpoint instead of truncating or deleting the other's file.
+# The lock is an flock on <key>.lock, which the OS drops if the process dies,
+# so a crashed job never keeps its checkpoint from being resumed; evict()
+# clears the lock files crashed jobs leave behind.
+
+CHECKPOINT_DIR = os.environ.get(
+    "TRANSCRIPT_CHECKPOINT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "transcription_app", "checkpoints"),
+)
+TTL_SECONDS = float(os.environ.get("TRANSCRIPT_CHECKPOINT_TTL_DAYS", "7")) * 86400
+
+
+class Checkpoint:
+    def __init__(self, key, checkpoint_dir=None):
+        self.dir = checkpoint_dir or CHECKPOINT_DIR
+        self.path = os.path.join(self.dir, f"{key}.jsonl")
+        self.lock_path = os.path.join(self.dir, f"{key}.lock")
+        self.header = None     # {"language": ..., "cuts": [...]}
+        self.windows = {}      # window index -> stitched segments
+        self._lock = threading.Lock()
+        self._lock_fd = None
+        self._load()
+
+    def _load(self, repair=False):
+        # Reads the finished windows; only the lock holder cuts off a torn line,
+        # since without the lock it may be a line another job is writing.
+        self.header, self.windows = None, {}
+        try:
+            f = open(self.path, "r+b" if repair else "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            good = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                if self.header is None:
+                    self.header = record
+                else:
+                    self.windows[record["window"]] = record["segments"]
+                good += len(line)
+            if repair:
+                f.truncate(good)
+
+    def acquire(self):
+        # Takes the key's lock without waiting; False if another job holds it.
+        os.makedirs(self.dir, exist_ok=True)
+        if fcntl is None:
+            try:
+                self._lock_fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                return False
+        else:
+            while True:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_WRONLY)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    os.close(fd)
+                    return False
+                try:
+                    if os.fstat(fd).st_ino == os.stat(self.lock_path).st_ino:
+                        break
+                except FileNotFoundError:
+                    pass
+                os.close(fd)  # released or evicted meanwhile: lock the current file
+            self._lock_fd = fd
+        os.utime(self.lock_path)  # eviction age counts from the last holder
+        # Whatever the previous holder left is the state to resume from.
+        self._load(repair=True)
+        return True
+
+    def release(self):
+        if self._lock_fd is None:
+            return
+        # Removed while still held; a job that opened it meanwhile notices the
+        # file is gone once it gets the lock and retries (acquire).
+        os.remove(self.lock_path)
+        os.close(self._lock_fd)
+        self._lock_fd = None
+
+    def committed_seconds(self, sampling_rate=16000):
+        if self.header is None:
+            return 0.0
+        cuts = self.header["cuts"]
+        return sum(cuts[i + 1] - cuts[i] for i in self.windows) / sampling_rate
+
+    def matches(self, cuts, language=None):
+        return (self.header is not None and self.header["cuts"] == list(cuts)
+                and (language is None or self.header["language"] == language))
+
+    def start(self, language, cuts):
+        # Begins a fresh checkpoint for this window plan.
+        os.makedirs(self.dir, exist_ok=True)
+        with self._lock:
+            self.header = {"language": language, "cuts": [int(c) for c in cuts]}
+            self.windows = {}
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(self.header) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def commit(self, index, segments):
+        # Called from worker threads as windows finish, in any order.
+        line = json.dumps({"window": index, "segments": segments}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.windows[index] = segments
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def evict(checkpoint_dir=None, ttl_seconds=TTL_SECONDS):
+    # Abandoned checkpoints (file deleted, never resumed) expire after the TTL,
+    # along with lock files no job holds any more.
+    checkpoint_dir = checkpoint_dir or CHECKPOINT_DIR
+    now = time.time()
+    try:
+        entries = list(os.scandir(checkpoint_dir))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime <= ttl_seconds:
+                continue
+            if entry.name.endswith(".jsonl"):
+                os.remove(entry.path)
+            elif entry.name.endswith(".lock"):
+                _remove_unheld_lock(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_unheld_lock(path):
+    if fcntl is None:
+        os.remove(path)  # left behind by a crash: nothing drops it otherwise
+        return
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.remove(path)
+    except OSError:
+        pass  # held by a running job
+    finally:
+        os.close(fd)
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# ==============================
+# CPU thread and worker tuning
+# ==============================
+# CTranslate2 fixes a model's intra-op thread count (cpu_threads) and its
+# number of parallel replicas (num_workers) at construction. This module
+# sizes both once per host from the cores this process may actually use: CPU
+# affinity and the cgroup quota of the container. The plan is part of the
+# model-cache key, so it must not follow the load: every job of every engine
+# uses the same one and each model is loaded once per process. The load goes
+# into admission instead: the scheduler only starts a job while its threads
+# fit in the cores other processes leave free (usable_cores), so a busy host
+# runs fewer jobs at once and cores released by finished jobs go to the next
+# ones. Running jobs lease their threads, so our own decodes are not counted
+# as outside load.
+#
+# Usage: python cpu_tuning.py --calibrate --model base   (records the best
+# threads-per-decode for this host in SETTINGS_PATH)
+
+SETTINGS_PATH = os.environ.get(
+    "CPU_TUNING_FILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "transcription_app", "cpu_tuning.json"),
+)
+# Without calibration: ctranslate2 scales well up to ~4 threads per decode.
+DEFAULT_THREADS_PER_DECODE = 4
+LOAD_REFRESH_SECONDS = 5.0
+
+
+# -------------------------------
+# Host capacity
+# -------------------------------
+def cgroup_cpu_limit():
+    # CPU quota of the enclosing cgroup in cores, or None when unlimited.
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:                      # cgroup v2
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:         # cgroup v1
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cores():
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cores = min(cores, max(1, int(limit)))
+    return max(1, cores)
+
+
+def _power_of_two_at_most(n):
+    # Thread counts are kept to powers of two so the model cache holds few variants.
+    p = 1
+    while p * 2 <= n:
+        p *= 2
+    return p
+
+
+def load_settings(path=SETTINGS_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# -------------------------------
+# Leases
+# -------------------------------
+class Tuner:
+    def __init__(self, settings_path=SETTINGS_PATH):
+        settings = load_settings(settings_path)
+        self.threads_per_decode = int(settings.get("threads_per_decode", DEFAULT_THREADS_PER_DECODE))
+        self.cores = available_cores()
+        self._lock = threading.Lock()
+        self._held = {}           # lease id -> threads
+        self._ids = 0
+        self._load = (0.0, 0.0)   # (checked at, busy cores outside our leases)
+
+    def _external_busy(self):
+        # Busy cores not accounted for by our own leases. The load average is
+        # host-wide, so it is taken as a fraction of the host and applied to
+        # our share of it.
+        checked, busy = self._load
+        if time.monotonic() - checked > LOAD_REFRESH_SECONDS:
+            try:
+                load = os.getloadavg()[0]
+            except (AttributeError, OSError):
+                load = 0.0
+            host = os.cpu_count() or 1
+            own = sum(self._held.values())
+            busy = max(0.0, min(1.0, (load - own) / host)) * self.cores
+            self._load = (time.monotonic(), busy)
+        return busy
+
+    def usable_cores(self):
+        # Cores left to this process by the rest of the host.
+        with self._lock:
+            return max(1, self.cores - int(round(self._external_busy())))
+
+    def free_cores(self):
+        with self._lock:
+            usable = self.cores - int(round(self._external_busy()))
+            return max(1, usable - sum(self._held.values()))
+
+    def plan(self):
+        # (cpu_threads, num_workers) of every model this process loads: one
+        # replica per threads_per_decode worth of cores, so parallel windows,
+        # queued files and service workers each get a replica.
+        cpu_threads = _power_of_two_at_most(min(self.cores, self.threads_per_decode))
+        return cpu_threads, max(1, self.cores // cpu_threads)
+
+    def default_workers(self):
+        return max(1, self.cores // self.threads_per_decode)
+
+    def job_threads(self, engine="standard", workers=None):
+        # Threads a job keeps busy: one replica, or one per parallel window
+        # of the chunked engine.
+        cpu_threads, num_workers = self.plan()
+        replicas = min(workers or num_workers, num_workers) if engine == "chunked" else 1
+        return cpu_threads * replicas
+
+    @contextmanager
+    def lease(self, engine="standard", workers=None):
+        # Yields the host plan and records the threads this job keeps busy.
+        with self._lock:
+            cpu_threads, num_workers = self.plan()
+            self._ids += 1
+            lease_id = self._ids
+            self._held[lease_id] = self.job_threads(engine, workers)
+        try:
+            yield cpu_threads, num_workers
+        finally:
+            with self._lock:
+                del self._held[lease_id]
+
+    def stats(self):
+        with self._lock:
+            held = sum(self._held.values())
+            return {
+                "cores": self.cores,
+                "threads_per_decode": self.threads_per_decode,
+                "active_jobs": len(self._held),
+                "threads_leased": held,
+                "external_busy_cores": round(self._load[1], 2),
+            }
+
+
+# Process-wide instance shared by all sessions.
+tuner = Tuner()
+
+
+# -------------------------------
+# Calibration
+# -------------------------------
+def calibrate(model_size="base", compute_type="int8", audio_path=None, seconds=30, log=print):
+    # Runs cores // t concurrent decodes of the same clip for each candidate
+    # thread count t and keeps the t with the highest aggregate throughput.
+    import audio_io
+    import model_cache
+
+    if audio_path:
+        audio = audio_io.decode_audio(audio_path)[: int(seconds * audio_io.SAMPLE_RATE)]
+    else:
+        from benchmarks.fixtures import speech_like
+        audio = speech_like(seconds)
+    clip_seconds = len(audio) / audio_io.SAMPLE_RATE
+    cores = available_cores()
+
+    candidates = sorted({_power_of_two_at_most(n) for n in range(1, cores + 1)})
+    results = []
+    for threads in candidates:
+        workers = max(1, cores // threads)
+        model = model_cache.get_model(model_size, device="cpu", compute_type=compute_type,
+                                      cpu_threads=threads, num_workers=workers)
+
+        def decode(_):
+            segments, _ = model.transcribe(audio, language="en", word_timestamps=True)
+            return list(segments)
+
+        decode(None)  # warm-up
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(decode, range(workers)))
+        wall = time.perf_counter() - started
+        throughput = workers * clip_seconds / wall
+        results.append({"threads": threads, "workers": workers, "wall_seconds": round(wall, 3),
+                        "audio_seconds_per_second": round(throughput, 3)})
+        log(f"{threads} threads x {workers} workers: {throughput:.2f} audio s/s")
+        model_cache.clear()
+
+    best = max(results, key=lambda r: r["audio_seconds_per_second"])
+    return {
+        "threads_per_decode": best["threads"],
+        "cores": cores,
+        "model": model_size,
+        "compute_type": compute_type,
+        "calibrated_at": time.time(),
+        "results": results,
+    }
+
+
+def save_settings(settings, path=SETTINGS_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU thread tuning for the inference engine")
+    parser.add_argument("--calibrate", action="store_true", help="measure and record the best settings")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--audio", help="media file to calibrate on (default: synthetic speech)")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--output", default=SETTINGS_PATH)
+    args = parser.parse_args(argv)
+
+    if args.calibrate:
+        settings = calibrate(args.model, args.compute_type, args.audio, args.seconds)
+        save_settings(settings, args.output)
+        print(f"Recorded {settings['threads_per_decode']} threads per decode in {args.output}")
+    else:
+        print(json.dumps({**tuner.stats(), "free_cores": tuner.free_cores()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import csv
+import io
+import json
+
+import numpy as np
+
+# ==============================
+# Streaming transcript exports
+# ==============================
+# Every writer walks one view of a Transcript (segments, word rows or word
+# chunks, see Transcript.rows) a batch of rows at a time and yields encoded
+# chunks, so no format is ever built as one big string. The batch CLI and the
+# HTTP service write the chunks out as they come; the pages join them once per
+# (view, format) and keep the bytes for later reruns.
+
+BATCH_ROWS = 5000
+
+# format -> (file extension, MIME type, label)
+FORMATS = {
+    "csv": ("csv", "text/csv", "CSV"),
+    "jsonl": ("jsonl", "application/jsonl", "JSON Lines"),
+    "srt": ("srt", "application/x-subrip", "SRT subtitles"),
+    "vtt": ("vtt", "text/vtt", "WebVTT subtitles"),
+}
+
+
+def _batches(transcript, include_words, chunk_size):
+    # Yields (start, end, texts) for consecutive slices of the view.
+    start, end, lo, hi = transcript.rows(include_words, chunk_size)
+    for i in range(0, len(start), BATCH_ROWS):
+        j = i + BATCH_ROWS
+        yield start[i:j], end[i:j], transcript.texts(lo[i:j], hi[i:j])
+
+
+def _timestamps(seconds, separator):
+    # HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (WebVTT) for a whole array at once.
+    ms = np.rint(np.maximum(seconds, 0).astype(np.float64) * 1000).astype(np.int64)
+    return [
+        f"{h:02d}:{m:02d}:{s:02d}{separator}{f:03d}"
+        for h, m, s, f in zip(
+            (ms // 3600000).tolist(), (ms // 60000 % 60).tolist(),
+            (ms // 1000 % 60).tolist(), (ms % 1000).tolist()
+        )
+    ]
+
+
+# -------------------------------
+# Writers
+# -------------------------------
+def csv_chunks(transcript, include_words=False, chunk_size=None, bom=True):
+    # Same columns and number formatting as DataFrame.to_csv of the table view.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["start_time", "end_time", "text"])
+    yield ("\ufeff" if bom else "").encode("utf-8") + buffer.getvalue().encode("utf-8")
+    for start, end, texts in _batches(transcript, include_words, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(zip(start.astype(str).tolist(), end.astype(str).tolist(), texts))
+        yield buffer.getvalue().encode("utf-8")
+
+
+def jsonl_chunks(transcript, include_words=False, chunk_size=None):
+    for start, end, texts in _batches(transcript, include_words, chunk_size):
+        yield "".join(
+            f'{{"start": {s}, "end": {e}, "text": {json.dumps(t, ensure_ascii=False)}}}\n'
+            for s, e, t in zip(start.astype(str).tolist(), end.astype(str).tolist(), texts)
+        ).encode("utf-8")
+
+
+def _cues(transcript, include_words, chunk_size, separator):
+    # Yields a list of (start, end, text) per batch, non-empty rows only; a
+    # blank text line would end a cue early, so line breaks are flattened.
+    for start, end, texts in _batches(transcript, include_words, chunk_size):
+        cues = zip(_timestamps(start, separator), _timestamps(end, separator), texts)
+        yield [(s, e, text) for s, e, text in ((s, e, " ".join(t.split())) for s, e, t in cues) if text]
+
+
+def srt_chunks(transcript, include_words=False, chunk_size=None):
+    number = 0
+    for cues in _cues(transcript, include_words, chunk_size, ","):
+        yield "".join(
+            f"{n}\n{s} --> {e}\n{text}\n\n" for n, (s, e, text) in enumerate(cues, number + 1)
+        ).encode("utf-8")
+        number += len(cues)
+
+
+def vtt_chunks(transcript, include_words=False, chunk_size=None):
+    yield b"WEBVTT\n\n"
+    for cues in _cues(transcript, include_words, chunk_size, "."):
+        # "<", ">" and "&" are markup in cue text.
+        yield "".join(
+            f"{s} --> {e}\n{text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')}\n\n"
+            for s, e, text in cues
+        ).encode("utf-8")
+
+
+WRITERS = {"csv": csv_chunks, "jsonl": jsonl_chunks, "srt": srt_chunks, "vtt": vtt_chunks}
+
+
+def export_chunks(transcript, fmt, include_words=False, chunk_size=None):
+    if fmt not in WRITERS:
+        raise ValueError(f"unknown export format: {fmt}")
+    return WRITERS[fmt](transcript, include_words=include_words, chunk_size=chunk_size)
+
+
+def write_file(path, transcript, fmt, include_words=False, chunk_size=None):
+    with open(path, "wb") as f:
+        for chunk in export_chunks(transcript, fmt, include_words, chunk_size):
+            f.write(chunk)
+
+
+# -------------------------------
+# Memoized exports
+# -------------------------------
+class ExportCache:
+    # Serialized exports of one transcript, keyed by view and format, so a
+    # Streamlit rerun hands the same bytes to the download button instead of
+    # serializing again. Oldest entries are dropped past max_entries.
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def get(self, transcript, fmt, include_words=False, chunk_size=None):
+        # Chunking takes precedence over word rows, so both map to the same view
+        key = (fmt, False, chunk_size) if chunk_size else (fmt, include_words, None)
+        if key not in self._entries:
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = b"".join(export_chunks(transcript, fmt, include_words, chunk_size))
+        return self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
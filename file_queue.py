@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import exports
+import metrics
+import pipeline
+import transcript_cache
+import transcriber
+from scheduler import scheduler
+from transcript import Transcript
+
+# ==============================
+# Multi-file transcription queue
+# ==============================
+# Files uploaded together are transcribed by a bounded pool of background
+# threads that share one cached model (a replica per worker). The threads
+# outlive Streamlit reruns; the page polls each file's status and progress,
+# offers finished files for download right away and the whole set as a zip.
+
+
+class QueuedFile:
+    def __init__(self, name, path, sha256):
+        self.name = name
+        self.path = path
+        self.sha256 = sha256
+        self.status = "queued"      # queued, waiting, running, done, failed, cancelled
+        self.progress = 0.0
+        self.error = None
+        self.cached = False
+        self.transcript = None
+        self.finished = None
+        self.exports = exports.ExportCache()  # downloads, serialized once per view and format
+
+    @property
+    def stem(self):
+        return os.path.splitext(os.path.basename(self.name))[0]
+
+
+class FileQueue:
+    # `options` are pipeline.transcribe_audio keyword arguments (model_size,
+    # language, engine, compute_type, trim, ...). `transcribe` is injectable
+    # like transcription_service.JobQueue's.
+    def __init__(self, files, options, workers=2, transcribe=pipeline.transcribe_audio):
+        self.files = files
+        self.options = options
+        self.workers = max(1, min(workers, len(files)))
+        self.transcribe = transcribe
+        self.started = time.time()
+        self._cancelled = threading.Event()
+        self._exports = {}  # memoized zips; the page re-renders them every second
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="file-queue")
+        for item in files:
+            self._pool.submit(self._run, item)
+        self._pool.shutdown(wait=False)
+
+    @property
+    def running(self):
+        return any(item.finished is None for item in self.files)
+
+    def counts(self):
+        counts = {}
+        for item in self.files:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return counts
+
+    def cancel(self):
+        # Queued files are skipped; files already decoding run to completion.
+        self._cancelled.set()
+
+    def _run(self, item):
+        if self._cancelled.is_set():
+            item.status, item.finished = "cancelled", time.time()
+            return
+        options = self.options
+        job = metrics.JobMetrics(
+            source="streamlit-batch", model=options.get("model_size", "base"),
+            engine=options.get("engine", "standard")
+        ).start()
+        try:
+            key = pipeline.cache_key(
+                item.sha256, options.get("model_size", "base"), options.get("language"),
+                options.get("engine", "standard"), compute_type=options.get("compute_type", "int8"),
+                trim=options.get("trim"), window_seconds=options.get("window_seconds", 300),
+                batch_size=options.get("batch_size", 8)
+            )
+            with metrics.stage("cache_lookup"):
+                results = transcript_cache.get(key)
+            item.cached = results is not None
+            if results is None:
+                audio = pipeline.load_audio(item.path)
+                if audio is None:
+                    raise ValueError("no audio track")
+                item.status = "waiting"
+
+                def on_progress(fraction):
+                    item.progress = fraction
+
+                # Each file takes a slot like any other session's job; a
+                # chunked file weighs as many slots as the windows it runs at once.
+                with scheduler.acquire(
+                    options.get("model_size", "base"), compute_type=options.get("compute_type", "int8"),
+                    engine=options.get("engine", "standard"),
+                    workers=options.get("workers") or transcriber.default_workers()
+                ):
+                    item.status = "running"
+                    results = self.transcribe(
+                        audio, **options, on_progress=on_progress, content_hash=item.sha256
+                    )
+                transcript_cache.put(key, results)
+            with metrics.stage("format"):
+                item.transcript = Transcript.from_results(results)
+            item.progress = 1.0
+            item.status = "done"
+        except Exception as e:
+            item.error = str(e)
+            item.status = "failed"
+        finally:
+            job.finish(status="ok" if item.status == "done" else "failed")
+            item.finished = time.time()
+            if os.path.exists(item.path):
+                os.remove(item.path)
+
+    def export(self, index, fmt="csv", include_words=False, chunk_size=None):
+        item = self.files[index]
+        return item.exports.get(item.transcript, fmt, include_words, chunk_size)
+
+    def archive(self, fmt="csv", include_words=False, chunk_size=None):
+        # One zip with the chosen export (current view settings) and the raw
+        # JSON per finished file.
+        key = (fmt, include_words, chunk_size, sum(item.transcript is not None for item in self.files))
+        if key not in self._exports:
+            self._exports[key] = self._build_archive(fmt, include_words, chunk_size)
+        return self._exports[key]
+
+    def _build_archive(self, fmt, include_words, chunk_size):
+        buffer = io.BytesIO()
+        used = set()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            for index, item in enumerate(self.files):
+                if item.transcript is None:
+                    continue
+                stem, n = item.stem, 1
+                while stem in used:
+                    n += 1
+                    stem = f"{item.stem}_{n}"
+                used.add(stem)
+                zf.writestr(f"{stem}.{exports.FORMATS[fmt][0]}", self.export(index, fmt, include_words, chunk_size))
+                zf.writestr(f"{stem}.json", json.dumps(item.transcript.to_results(), ensure_ascii=False))
+        return buffer.getvalue()
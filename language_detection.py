@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+
+import transcript_cache
+
+# ==============================
+# Language auto-detection
+# ==============================
+# "Auto-detect" settles the language before the transcription pass instead
+# of letting the model guess from the first 30 seconds, which are often an
+# intro, music or silence. A few short clips spread across the file are
+# scored by the already-loaded model and their language probabilities are
+# averaged. Each clip is the loudest window of its share of the file, so
+# silent stretches are not sampled. Results are cached by content hash, so
+# a file is only detected once per model.
+
+AUTO = "auto"
+SAMPLES = int(os.environ.get("LANGUAGE_DETECT_SAMPLES", "3"))
+SAMPLE_SECONDS = float(os.environ.get("LANGUAGE_DETECT_SECONDS", "10"))
+FRAME_SECONDS = 0.5  # loudness resolution when placing the clips
+
+
+def sample_offsets(audio, samples=SAMPLES, seconds=SAMPLE_SECONDS, sampling_rate=16000):
+    # Start sample of the loudest `seconds`-long window in each of `samples`
+    # equal parts of the audio.
+    clip = int(seconds * sampling_rate)
+    if len(audio) <= clip:
+        return [0]
+    frame = int(FRAME_SECONDS * sampling_rate)
+    window = max(1, int(seconds / FRAME_SECONDS))
+    n_frames = len(audio) // frame
+    if n_frames < window * samples:
+        # Too short to split: evenly spaced clips, overlapping if need be
+        last = len(audio) - clip
+        return sorted({last * k // max(1, samples - 1) for k in range(samples)})
+
+    energy = np.square(audio[: n_frames * frame].reshape(n_frames, frame), dtype=np.float32).sum(axis=1)
+    # Energy of the window starting at each frame
+    cumulative = np.concatenate([[0.0], np.cumsum(energy, dtype=np.float64)])
+    windows = cumulative[window:] - cumulative[:-window]
+    bounds = np.linspace(0, len(windows), samples + 1).astype(int)
+    return [int(lo + np.argmax(windows[lo:hi])) * frame for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def detect(model, audio, samples=SAMPLES, seconds=SAMPLE_SECONDS, sampling_rate=16000, offsets=None):
+    # Returns {"language", "probability", "samples": [...]}; `audio` is a
+    # 16 kHz float32 array. For trimmed audio, `offsets` (silence.OffsetMap)
+    # puts the sample starts back in original media time.
+    clip = int(seconds * sampling_rate)
+    totals, clips = {}, []
+    for offset in sample_offsets(audio, samples, seconds, sampling_rate):
+        language, probability, all_probs = model.detect_language(audio=audio[offset: offset + clip])
+        for code, p in all_probs or [(language, probability)]:
+            totals[code] = totals.get(code, 0.0) + p
+        clips.append({"start": offset / sampling_rate, "language": language,
+                      "probability": round(float(probability), 4)})
+    if not clips:
+        return None
+    starts = [c["start"] for c in clips]
+    if offsets is not None:
+        starts = offsets.to_original(starts).tolist()
+    for c, start in zip(clips, starts):
+        c["start"] = round(start, 2)
+    language = max(totals, key=totals.get)
+    return {
+        "language": language,
+        "probability": round(totals[language] / len(clips), 4),
+        "samples": clips,
+    }
+
+
+def cache_key(content_hash, model_size, compute_type, samples=SAMPLES, seconds=SAMPLE_SECONDS, trim=None):
+    # Trimming changes which audio the clips are cut from.
+    return transcript_cache.make_key(content_hash, model_size, None, "language-detection",
+                                     compute_type=compute_type, samples=samples, seconds=seconds, trim=trim)
+
+
+def detect_cached(model, audio, content_hash=None, model_size="base", compute_type="int8",
+                  trim=None, offsets=None):
+    # Same as detect(), reusing an earlier answer for the same content and
+    # trim method.
+    key = cache_key(content_hash, model_size, compute_type, trim=trim) if content_hash else None
+    if key is not None:
+        cached = transcript_cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+    result = detect(model, audio, offsets=offsets)
+    if key is not None and result is not None:
+        transcript_cache.put(key, result)
+    return result
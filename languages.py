@@ -1,4 +1,5 @@
 lang_map = {
+    "Auto-detect": "auto",  # from short samples of the file, see language_detection.py
     "English": "en",
     "Chinese": "zh",
     "German": "de",
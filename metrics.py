@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ==============================
+# Pipeline instrumentation
+# ==============================
+# A JobMetrics is activated on the thread running a job; pipeline code marks
+# its stages with `with metrics.stage("decode"):`, which is a no-op when no
+# job is active. Finished jobs are written as one JSON log line and folded
+# into process-wide Prometheus counters and histograms.
+
+logger = logging.getLogger("transcription.metrics")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+SAMPLE_INTERVAL = 0.1
+_local = threading.local()
+
+
+def _rss_bytes():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # ru_maxrss is the lifetime peak (KiB on Linux), the best available here.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _ResourceSampler:
+    def __init__(self):
+        self.peak_rss = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._cpu_start = os.times()
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            self.peak_rss = max(self.peak_rss, _rss_bytes())
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, _rss_bytes())
+        end = os.times()
+        return (end.user - self._cpu_start.user) + (end.system - self._cpu_start.system)
+
+
+class JobMetrics:
+    def __init__(self, **labels):
+        self.labels = labels
+        self.stages = OrderedDict()
+        self.audio_seconds = None
+        self.summary = None
+        self._started = None
+        self._sampler = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._sampler = _ResourceSampler()
+        self._sampler.start()
+        _local.job = self
+        return self
+
+    def add_stage(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def finish(self, status="ok"):
+        if getattr(_local, "job", None) is self:
+            _local.job = None
+        wall = time.perf_counter() - self._started
+        cpu_seconds = self._sampler.stop()
+        self.summary = {
+            "event": "transcription_job",
+            **self.labels,
+            "status": status,
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "wall_seconds": round(wall, 4),
+            # Process-wide CPU time, so concurrent jobs see each other's share.
+            "process_cpu_seconds": round(cpu_seconds, 4),
+            "avg_cpu_cores": round(cpu_seconds / wall, 2) if wall > 0 else 0.0,
+            "peak_rss_mb": round(self._sampler.peak_rss / 2**20, 1),
+            "audio_seconds": round(self.audio_seconds, 3) if self.audio_seconds else None,
+            "real_time_factor": round(wall / self.audio_seconds, 4) if self.audio_seconds else None,
+        }
+        registry.observe_job(self)
+        logger.info(json.dumps(self.summary))
+        return self.summary
+
+
+def current_job():
+    return getattr(_local, "job", None)
+
+
+@contextmanager
+def stage(name):
+    job = current_job()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if job is not None:
+            job.add_stage(name, time.perf_counter() - started)
+
+
+# -------------------------------
+# Prometheus-style registry
+# -------------------------------
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = {}               # status -> count
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.stage_seconds = {}      # stage -> _Histogram
+        self.job_seconds = _Histogram(SECONDS_BUCKETS)
+        self.rtf = _Histogram(RTF_BUCKETS)
+        self.peak_rss = 0
+
+    def observe_job(self, job):
+        s = job.summary
+        with self._lock:
+            self.jobs[s["status"]] = self.jobs.get(s["status"], 0) + 1
+            self.cpu_seconds += s["process_cpu_seconds"]
+            self.job_seconds.observe(s["wall_seconds"])
+            self.peak_rss = max(self.peak_rss, job._sampler.peak_rss)
+            for name, seconds in job.stages.items():
+                self.stage_seconds.setdefault(name, _Histogram(SECONDS_BUCKETS)).observe(seconds)
+            if job.audio_seconds:
+                self.audio_seconds += job.audio_seconds
+                self.rtf.observe(s["real_time_factor"])
+
+    @staticmethod
+    def _histogram_lines(name, hist, labels=""):
+        sep = "," if labels else ""
+        lines = []
+        for bound, count in zip(hist.buckets, hist.counts):
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {hist.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {hist.sum}")
+        lines.append(f"{name}_count{suffix} {hist.count}")
+        return lines
+
+    def render(self):
+        with self._lock:
+            lines = [
+                "# HELP transcription_jobs_total Finished transcription jobs.",
+                "# TYPE transcription_jobs_total counter",
+            ]
+            lines += [f'transcription_jobs_total{{status="{k}"}} {v}' for k, v in self.jobs.items()]
+            lines += [
+                "# HELP transcription_audio_seconds_total Seconds of audio transcribed.",
+                "# TYPE transcription_audio_seconds_total counter",
+                f"transcription_audio_seconds_total {self.audio_seconds}",
+                "# HELP transcription_cpu_seconds_total Process CPU time while jobs ran.",
+                "# TYPE transcription_cpu_seconds_total counter",
+                f"transcription_cpu_seconds_total {self.cpu_seconds}",
+                "# HELP transcription_peak_rss_bytes Highest resident set size seen during a job.",
+                "# TYPE transcription_peak_rss_bytes gauge",
+                f"transcription_peak_rss_bytes {self.peak_rss}",
+                "# HELP transcription_job_seconds Wall time per job.",
+                "# TYPE transcription_job_seconds histogram",
+            ]
+            lines += self._histogram_lines("transcription_job_seconds", self.job_seconds)
+            lines += [
+                "# HELP transcription_real_time_factor Job wall time divided by audio duration.",
+                "# TYPE transcription_real_time_factor histogram",
+            ]
+            lines += self._histogram_lines("transcription_real_time_factor", self.rtf)
+            lines += [
+                "# HELP transcription_stage_seconds Wall time per pipeline stage.",
+                "# TYPE transcription_stage_seconds histogram",
+            ]
+            for name, hist in self.stage_seconds.items():
+                lines += self._histogram_lines("transcription_stage_seconds", hist, f'stage="{name}"')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# -------------------------------
+# Local /metrics endpoint
+# -------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def start_http_server(port=None, host="127.0.0.1"):
+    # Idempotent per process. METRICS_PORT=0 disables the endpoint; a port
+    # already taken (e.g. by another server process) is not an error.
+    global _server, _server_started
+    port = int(os.environ.get("METRICS_PORT", "9464")) if port is None else port
+    with _server_lock:
+        if _server_started or port == 0:
+            return _server
+        _server_started = True
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError:
+            return None
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ==============================
+# Process-wide WhisperModel cache
+# ==============================
+# Streamlit reruns the page script on every interaction, but imported modules
+# stay in sys.modules, so this registry is shared by every session served by
+# the same server process.
+
+# Approximate parameter counts (millions) used to estimate resident size.
+MODEL_PARAMS_M = {
+    "tiny": 39,
+    "base": 74,
+    "small": 244,
+    "medium": 769,
+    "large": 1550,
+}
+
+BYTES_PER_PARAM = {
+    "int8": 1,
+    "int8_float32": 1,
+    "int8_float16": 1,
+    "int8_bfloat16": 1,
+    "float16": 2,
+    "bfloat16": 2,
+    "float32": 4,
+    "default": 4,
+}
+
+# Memory budget for all cached models, overridable per deployment.
+DEFAULT_BUDGET_MB = int(os.environ.get("MODEL_CACHE_BUDGET_MB", "4096"))
+
+
+class _Entry:
+    def __init__(self, model, size_mb, load_seconds):
+        self.model = model
+        self.size_mb = size_mb
+        self.load_seconds = load_seconds
+
+
+_lock = threading.Lock()
+_models = OrderedDict()
+_key_locks = {}
+_budget_mb = DEFAULT_BUDGET_MB
+_prewarmed = set()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "load_seconds": 0.0}
+
+
+def estimate_model_mb(model_size, compute_type="int8"):
+    # "tiny.en" -> "tiny", "large-v3" -> "large"; unknown names count as large.
+    family = model_size.split(".")[0].split("-")[0]
+    params_m = MODEL_PARAMS_M.get(family, MODEL_PARAMS_M["large"])
+    # Runtime buffers and the tokenizer add a roughly constant overhead.
+    return params_m * BYTES_PER_PARAM.get(compute_type, 4) + 100
+
+
+def _evict_locked():
+    total = sum(e.size_mb for e in _models.values())
+    # Always keep the most recently loaded model, even if it alone is over budget.
+    while total > _budget_mb and len(_models) > 1:
+        _, entry = _models.popitem(last=False)
+        total -= entry.size_mb
+        _stats["evictions"] += 1
+
+
+def get_model(model_size="base", device="cpu", compute_type="int8", cpu_threads=0, num_workers=1):
+    key = (model_size, device, compute_type, cpu_threads, num_workers)
+
+    with _lock:
+        entry = _models.get(key)
+        if entry is not None:
+            _models.move_to_end(key)
+            _stats["hits"] += 1
+            return entry.model
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # Only one thread loads a given key; concurrent callers wait and then hit.
+    with key_lock:
+        with _lock:
+            entry = _models.get(key)
+            if entry is not None:
+                _models.move_to_end(key)
+                _stats["hits"] += 1
+                return entry.model
+
+        try:
+            # Deferred: importing faster_whisper/ctranslate2 alone takes ~0.3 s.
+            from faster_whisper import WhisperModel
+            start = time.perf_counter()
+            model = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
+            elapsed = time.perf_counter() - start
+        except BaseException:
+            with _lock:
+                _key_locks.pop(key, None)
+            raise
+
+        # Published and unlocked in one step: a caller that misses the key
+        # lock from here on finds the entry instead of loading again.
+        with _lock:
+            _stats["misses"] += 1
+            _stats["load_seconds"] += elapsed
+            _models[key] = _Entry(model, estimate_model_mb(model_size, compute_type), elapsed)
+            _key_locks.pop(key, None)
+            _evict_locked()
+        return model
+
+
+def prewarm(model_size, device="cpu", compute_type="int8", cpu_threads=0, num_workers=1):
+    # Loads a model on a daemon thread, once per key and process. A job that
+    # asks for the same key meanwhile waits on that load instead of repeating it.
+    key = (model_size, device, compute_type, cpu_threads, num_workers)
+    with _lock:
+        if key in _prewarmed:
+            return None
+        _prewarmed.add(key)
+
+    def load():
+        try:
+            get_model(model_size, device, compute_type, cpu_threads, num_workers)
+        except Exception:
+            pass  # e.g. offline; the first real job reports the error
+
+    thread = threading.Thread(target=load, name=f"prewarm-{model_size}", daemon=True)
+    thread.start()
+    return thread
+
+
+def set_budget_mb(budget_mb):
+    global _budget_mb
+    with _lock:
+        _budget_mb = budget_mb
+        _evict_locked()
+
+
+def cache_stats():
+    with _lock:
+        return {
+            **_stats,
+            "loaded": [
+                {"key": key, "size_mb": e.size_mb, "load_seconds": e.load_seconds}
+                for key, e in _models.items()
+            ],
+            "memory_mb": sum(e.size_mb for e in _models.values()),
+            "budget_mb": _budget_mb,
+        }
+
+
+def clear():
+    with _lock:
+        _models.clear()
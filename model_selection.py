@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import threading
+
+import model_cache
+
+# ==============================
+# Budget-aware model selection
+# ==============================
+# "auto" picks the most accurate model size and compute type predicted to
+# finish within a deadline. Predictions use real-time factors measured on
+# this host: every pipeline run records its decode RTF and load time here,
+# including benchmark runs. Combinations never measured fall back to rough
+# priors for a 4-thread CPU.
+
+MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+COMPUTE_TYPES = ["float32", "int8"]
+
+# Most accurate first: model size dominates, float32 edges out int8 at a size.
+ACCURACY_ORDER = [(size, ct) for size in reversed(MODEL_SIZES) for ct in COMPUTE_TYPES]
+
+PRIOR_RTF = {"tiny": 0.04, "base": 0.08, "small": 0.25, "medium": 0.7, "large": 1.4}
+COMPUTE_SLOWDOWN = {"int8": 1.0, "float32": 1.8}
+PRIOR_LOAD_MB_PER_SECOND = 200
+SMOOTHING = 0.3  # weight of the newest measurement
+
+HISTORY_PATH = os.environ.get(
+    "MODEL_RTF_FILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "transcription_app", "rtf_history.json"),
+)
+
+
+class RtfHistory:
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    @staticmethod
+    def _key(model_size, compute_type, engine):
+        return f"{model_size}/{compute_type}/{engine}"
+
+    def observe(self, model_size, compute_type, engine, rtf=None, load_seconds=None):
+        with self._lock:
+            entry = self._entries.setdefault(self._key(model_size, compute_type, engine), {"samples": 0})
+            for name, value in (("rtf", rtf), ("load_seconds", load_seconds)):
+                if value is not None:
+                    old = entry.get(name)
+                    entry[name] = value if old is None else (1 - SMOOTHING) * old + SMOOTHING * value
+            if rtf is not None:
+                entry["samples"] += 1
+            self._save_locked()
+
+    def _save_locked(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # measurements are an optimisation; a read-only home is fine
+
+    def get(self, model_size, compute_type, engine):
+        with self._lock:
+            return dict(self._entries.get(self._key(model_size, compute_type, engine), {}))
+
+
+history = RtfHistory()
+
+
+def _is_loaded(model_size, compute_type):
+    return any(e["key"][0] == model_size and e["key"][2] == compute_type
+               for e in model_cache.cache_stats()["loaded"])
+
+
+def predict_seconds(model_size, compute_type, duration, engine="standard"):
+    # Returns (predicted wall seconds, whether the RTF was measured on this host).
+    entry = history.get(model_size, compute_type, engine)
+    rtf = entry.get("rtf")
+    measured = rtf is not None
+    if not measured:
+        rtf = PRIOR_RTF.get(model_size, PRIOR_RTF["large"]) * COMPUTE_SLOWDOWN.get(compute_type, 1.0)
+    if _is_loaded(model_size, compute_type):
+        load = 0.0
+    else:
+        load = entry.get("load_seconds")
+        if load is None:
+            load = model_cache.estimate_model_mb(model_size, compute_type) / PRIOR_LOAD_MB_PER_SECOND
+    return load + rtf * duration, measured
+
+
+def choose(duration, deadline_seconds, engine="standard", memory_budget_mb=None):
+    # Most accurate (model_size, compute_type) predicted to finish in time; the
+    # fastest one if nothing does. Returns a dict with the prediction.
+    budget = memory_budget_mb or model_cache.cache_stats()["budget_mb"]
+    candidates = [
+        (size, ct) for size, ct in ACCURACY_ORDER
+        if model_cache.estimate_model_mb(size, ct) <= budget
+    ] or [ACCURACY_ORDER[-1]]
+    if not duration:
+        # Unknown length: nothing to budget against, use the usual default.
+        return {"model_size": "base", "compute_type": "int8", "predicted_seconds": None,
+                "measured": False, "fits": True}
+
+    predictions = []
+    for size, ct in candidates:
+        seconds, measured = predict_seconds(size, ct, duration, engine)
+        choice = {"model_size": size, "compute_type": ct, "predicted_seconds": seconds,
+                  "measured": measured, "fits": seconds <= deadline_seconds}
+        if choice["fits"]:
+            return choice
+        predictions.append(choice)
+    return min(predictions, key=lambda c: c["predicted_seconds"])
@@ -0,0 +1,223 @@
+import copy
+import os
+import time
+
+import audio_io
+import checkpoints
+import cpu_tuning
+import language_detection
+import metrics
+import model_cache
+import model_selection
+import silence
+import transcriber
+import transcript_cache
+
+# ==============================
+# UI-independent transcription pipeline
+# ==============================
+# Shared by the Streamlit page and the headless entry points. Errors are
+# raised; callers decide how to surface them.
+
+# Model loaded in the background at server start; PREWARM_MODEL="" disables it.
+PREWARM_MODEL = os.environ.get("PREWARM_MODEL", "base")
+PREWARM_COMPUTE_TYPE = os.environ.get("PREWARM_COMPUTE_TYPE", "int8")
+
+VIDEO_EXTS = [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"]
+AUDIO_EXTS = [".wav", ".mp3", ".aac", ".ogg", ".flac"]
+MEDIA_EXTS = VIDEO_EXTS + AUDIO_EXTS
+
+
+def is_video(path):
+    return os.path.splitext(path)[1].lower() in VIDEO_EXTS
+
+
+def prewarm(model_size=PREWARM_MODEL, compute_type=PREWARM_COMPUTE_TYPE):
+    # Warms the exact cache key every job uses (the host's fixed thread plan).
+    if not model_size:
+        return None
+    cpu_threads, num_workers = cpu_tuning.tuner.plan()
+    return model_cache.prewarm(
+        model_size, device="cpu", compute_type=compute_type,
+        cpu_threads=cpu_threads, num_workers=num_workers
+    )
+
+
+# -------------------------------
+# Extract audio from video
+# -------------------------------
+def extract_audio_from_video(video_path, logger=None):
+    # Decodes straight to a 16 kHz mono float32 array; no temp WAV is written.
+    # Returns None when the container has no audio track.
+    with metrics.stage("extract_audio"):
+        return audio_io.decode_audio(video_path, logger=logger)
+
+
+def load_audio(path, logger=None):
+    # Videos are decoded here; audio files are handed to the model as paths.
+    if is_video(path):
+        return extract_audio_from_video(path, logger=logger)
+    return path
+
+
+def has_audio(path):
+    # Read from the container header, so a silent video is reported at upload
+    # time instead of after a decode.
+    try:
+        return audio_io.has_audio(path)
+    except Exception:
+        return True  # unreadable header: leave it to the decoder to report
+
+
+def audio_duration(audio):
+    # `audio` is either a decoded sample buffer or a path the model decodes itself
+    if isinstance(audio, str):
+        try:
+            return audio_io.probe_duration(audio)  # in seconds
+        except Exception:
+            return None  # fallback if the container has no duration
+    return len(audio) / audio_io.SAMPLE_RATE
+
+
+def cache_key(content_hash, model_size, language, engine, compute_type="int8", trim=None,
+              window_seconds=300, batch_size=8):
+    # Only options that change the output are part of the key.
+    options = {"compute_type": compute_type, "trim": trim}
+    if engine == "chunked":
+        options["window_seconds"] = window_seconds
+    elif engine == "batched":
+        options["batch_size"] = batch_size
+    return transcript_cache.make_key(content_hash, model_size, language, engine, **options)
+
+
+# -------------------------------
+# Drop silence and non-speech before decoding
+# -------------------------------
+def trim_silence(audio, method="vad"):
+    # Returns (trimmed samples, silence.OffsetMap); paths are decoded first.
+    with metrics.stage("trim"):
+        if isinstance(audio, str):
+            audio = audio_io.decode_audio(audio)
+        return silence.trim_non_speech(audio, method=method)
+
+
+# -------------------------------
+# Transcribe with the selected engine
+# -------------------------------
+def transcribe_audio(audio, model_size="base", language=None, engine="standard",
+                     workers=None, window_seconds=300, batch_size=8, compute_type="int8",
+                     trim=None, checkpoint_key=None, content_hash=None,
+                     on_progress=None, on_segment=None, record_rtf=True):
+    # Every job runs on the shared model built with the host's fixed thread
+    # plan; concurrent jobs are bounded by the scheduler, not by the plan.
+    # trim ("energy" or "vad") cuts non-speech first; timestamps in the results
+    # are still in original media time. With checkpoint_key, the long-file
+    # engine resumes from the windows an interrupted run already finished.
+    # language="auto" detects it from short samples first; content_hash lets
+    # that answer be cached. record_rtf=False keeps the run's speed out of the
+    # "auto" model choice (synthetic benchmark audio decodes unusually fast).
+    duration = audio_duration(audio)
+    job = metrics.current_job()
+    if job is not None:
+        job.audio_seconds = duration
+
+    offsets = None
+    if trim:
+        audio, offsets = trim_silence(audio, trim)
+        duration = offsets.kept_seconds
+        if on_segment is not None:
+            forward = on_segment
+
+            def on_segment(seg_data):
+                forward(offsets.remap_results({"segments": [copy.deepcopy(seg_data)]})["segments"][0])
+        if duration == 0:
+            return {"language": None if language == language_detection.AUTO else language,
+                    "segments": [], "trim": _trim_report(trim, offsets)}
+    if language == language_detection.AUTO and isinstance(audio, str):
+        # The clips are cut from samples; the model would decode the file anyway.
+        with metrics.stage("extract_audio"):
+            audio = audio_io.decode_audio(audio)
+
+    with cpu_tuning.tuner.lease(engine, workers) as (cpu_threads, num_workers):
+        if job is not None:
+            job.labels.update(compute_type=compute_type, cpu_threads=cpu_threads, num_workers=num_workers)
+        if engine == "chunked":
+            # Windows run in parallel on the model's replicas.
+            workers = workers or num_workers
+
+        # Shared across sessions; only the first request for a size pays the load.
+        misses = model_cache.cache_stats()["misses"]
+        started = time.perf_counter()
+        with metrics.stage("model_load"):
+            model = model_cache.get_model(
+                model_size, device="cpu", compute_type=compute_type,
+                cpu_threads=cpu_threads, num_workers=num_workers
+            )
+        load_seconds = time.perf_counter() - started
+
+        detection = None
+        if language == language_detection.AUTO:
+            with metrics.stage("detect_language"):
+                detection = language_detection.detect_cached(
+                    model, audio, content_hash, model_size=model_size, compute_type=compute_type,
+                    trim=trim or None, offsets=offsets
+                )
+            language = detection["language"] if detection else None
+
+        started = time.perf_counter()
+        with metrics.stage("decode"):
+            if engine == "chunked":
+                checkpoint = None
+                if checkpoint_key:
+                    checkpoints.evict()
+                    checkpoint = checkpoints.Checkpoint(checkpoint_key)
+                    if not checkpoint.acquire():
+                        # Another job is on the same content and settings; it
+                        # keeps the checkpoint and this one runs without.
+                        checkpoint = None
+                try:
+                    results = transcriber.transcribe_chunked(
+                        model, audio, language=language,
+                        window_seconds=window_seconds, workers=workers,
+                        on_progress=on_progress, on_segment=on_segment, checkpoint=checkpoint
+                    )
+                    if checkpoint is not None:
+                        checkpoint.discard()
+                finally:
+                    if checkpoint is not None:
+                        checkpoint.release()
+            elif engine == "batched":
+                results = transcriber.transcribe_batched(
+                    model, audio, language=language, batch_size=batch_size,
+                    duration=duration, on_progress=on_progress, on_segment=on_segment
+                )
+            else:
+                results = transcriber.transcribe(
+                    model, audio, language=language,
+                    duration=duration, on_progress=on_progress, on_segment=on_segment
+                )
+        decode_seconds = time.perf_counter() - started
+
+    if offsets is not None:
+        offsets.remap_results(results)
+        results["trim"] = _trim_report(trim, offsets)
+    if detection is not None:
+        results["language_detection"] = detection
+
+    # Measured speed on this host feeds the "auto" model choice.
+    if record_rtf:
+        model_selection.history.observe(
+            model_size, compute_type, engine,
+            rtf=decode_seconds / duration if duration else None,
+            load_seconds=load_seconds if model_cache.cache_stats()["misses"] > misses else None
+        )
+    return results
+
+
+def _trim_report(method, offsets):
+    return {
+        "method": method,
+        "original_seconds": round(offsets.original_seconds, 3),
+        "skipped_seconds": round(offsets.skipped_seconds, 3),
+        "regions": len(offsets.regions),
+    }
@@ -0,0 +1,329 @@
+import argparse
+import queue
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import audio_io
+import model_cache
+import silence
+
+# ==============================
+# Real-time streaming transcription
+# ==============================
+# PCM frames (16 kHz mono float32) from a live source go into a rolling buffer
+# that is re-decoded every `step_seconds`. Words that two consecutive decodes
+# agree on become stable and are cut from the buffer; the rest is provisional
+# and may still change. Both are emitted in the usual segment/word schema with
+# timestamps relative to the start of the stream.
+#
+# Usage:
+#   python realtime.py --wav meeting.wav          (replayed at real-time speed)
+#   python realtime.py --pipe /tmp/audio.fifo     (raw s16le 16 kHz mono)
+#   python realtime.py --mic                      (needs the sounddevice package)
+
+SAMPLE_RATE = audio_io.SAMPLE_RATE
+FRAME_SECONDS = 0.1
+NOISE_FLOOR_SECONDS = 30.0  # history the adaptive speech gate takes the noise floor from
+
+
+# -------------------------------
+# Sources: generators of float32 frames
+# -------------------------------
+def wav_file_source(path, realtime=True, frame_seconds=FRAME_SECONDS):
+    # Any file audio_io can decode, paced like a live stream for tests.
+    audio = audio_io.decode_audio(path)
+    frame = int(frame_seconds * SAMPLE_RATE)
+    started = time.monotonic()
+    for i, offset in enumerate(range(0, len(audio), frame)):
+        if realtime:
+            delay = started + i * frame_seconds - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        yield audio[offset: offset + frame]
+
+
+def pipe_source(path, frame_seconds=FRAME_SECONDS):
+    # Raw signed 16-bit little-endian mono PCM at 16 kHz, e.g. from
+    # `ffmpeg -i <input> -f s16le -ac 1 -ar 16000 <fifo>`; "-" reads stdin.
+    frame_bytes = int(frame_seconds * SAMPLE_RATE) * 2
+    f = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        while True:
+            data = f.read(frame_bytes)
+            if len(data) < 2:
+                break
+            yield np.frombuffer(data[: len(data) // 2 * 2], dtype="<i2").astype(np.float32) / 32768.0
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+
+def microphone_source(device=None, frame_seconds=FRAME_SECONDS):
+    try:
+        import sounddevice
+    except ImportError:
+        raise ImportError("Microphone capture needs the optional 'sounddevice' package") from None
+    frames = queue.Queue()
+    with sounddevice.InputStream(
+        samplerate=SAMPLE_RATE, channels=1, dtype="float32", device=device,
+        blocksize=int(frame_seconds * SAMPLE_RATE),
+        callback=lambda data, n, t, status: frames.put(data[:, 0].copy())
+    ):
+        while True:
+            yield frames.get()
+
+
+# -------------------------------
+# Rolling-window decoder
+# -------------------------------
+def _norm(text):
+    return re.sub(r"[^\w]", "", text.lower())
+
+
+class StreamingTranscriber:
+    def __init__(self, model, language=None, step_seconds=1.0, max_buffer_seconds=15.0,
+                 silence_commit_seconds=0.8, speech_detector="energy", speech_threshold_db=None):
+        self.model = model
+        self.language = language
+        self.step_seconds = step_seconds                  # decode cadence = provisional latency
+        self.max_buffer_seconds = max_buffer_seconds      # bound on latency to stable text
+        self.silence_commit_seconds = silence_commit_seconds
+        # "energy": loudness gate, fixed at speech_threshold_db or, by default,
+        # 10 dB over the stream's noise floor like silence.energy_regions.
+        # "vad": the Silero VAD of silence.vad_regions, which also rejects
+        # music and background noise, at some CPU cost per decode step.
+        self.speech_detector = speech_detector
+        self.speech_threshold_db = speech_threshold_db
+        self.levels = deque(maxlen=int(NOISE_FLOOR_SECONDS * 1000 / silence.FRAME_MS))  # frame dB history
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0.0   # stream time of buffer[0]
+        self.since_decode = 0
+        self.hypothesis = []      # provisional words from the previous decode
+        self.committed_text = ""
+        self.stats = {"decodes": 0, "decode_seconds": 0.0, "max_decode_seconds": 0.0}
+
+    @property
+    def buffer_end(self):
+        return self.buffer_start + len(self.buffer) / SAMPLE_RATE
+
+    def _trim(self, until):
+        # Drops audio before stream time `until`.
+        cut = int((until - self.buffer_start) * SAMPLE_RATE)
+        if cut > 0:
+            self.buffer = self.buffer[cut:]
+            self.buffer_start += cut / SAMPLE_RATE
+
+    def _threshold_db(self, db):
+        if self.speech_threshold_db is not None:
+            return self.speech_threshold_db
+        history = np.fromiter(self.levels, dtype=np.float64, count=len(self.levels)) if self.levels else db
+        return silence.adaptive_threshold_db(history)
+
+    def _has_speech(self, audio):
+        if self.speech_detector == "vad":
+            return bool(silence.vad_regions(audio, [(0, len(audio))], self.silence_commit_seconds))
+        db = silence.frame_db(audio)
+        return len(db) > 0 and db.max() > self._threshold_db(db)
+
+    def _trailing_silence(self):
+        tail = int(self.silence_commit_seconds * SAMPLE_RATE)
+        return len(self.buffer) > tail and not self._has_speech(self.buffer[-tail:])
+
+    def _decode(self):
+        started = time.perf_counter()
+        segments, info = self.model.transcribe(
+            self.buffer,
+            language=self.language,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=self.committed_text[-200:] or None,
+        )
+        words = []
+        for seg_index, segment in enumerate(segments):
+            for w in segment.words or []:
+                words.append({
+                    "start": self.buffer_start + w.start,
+                    "end": self.buffer_start + w.end,
+                    "word": w.word,
+                    "segment": seg_index,
+                })
+        # The first decode with speech fixes the language for the stream.
+        self.language = self.language or info.language
+        elapsed = time.perf_counter() - started
+        self.stats["decodes"] += 1
+        self.stats["decode_seconds"] += elapsed
+        self.stats["max_decode_seconds"] = max(self.stats["max_decode_seconds"], elapsed)
+        return words
+
+    @staticmethod
+    def _to_segments(words):
+        segments, ids = [], []
+        for w in words:
+            if not ids or ids[-1] != w["segment"]:
+                ids.append(w["segment"])
+                segments.append({"start": w["start"], "end": w["end"], "text": "", "words": []})
+            segments[-1]["end"] = w["end"]
+            segments[-1]["words"].append({"start": w["start"], "end": w["end"], "text": w["word"].strip()})
+        for seg in segments:
+            seg["text"] = " ".join(x["text"] for x in seg["words"])
+        return segments
+
+    def _commit(self, words):
+        if words:
+            self.committed_text += "".join(w["word"] for w in words)
+            self._trim(words[-1]["end"])
+        return self._to_segments(words)
+
+    def feed(self, samples):
+        # Returns (stable_segments, provisional_segments); both empty until the
+        # next decode is due.
+        self.buffer = np.concatenate([self.buffer, samples])
+        self.since_decode += len(samples)
+        if self.speech_detector == "energy":
+            self.levels.extend(silence.frame_db(samples).tolist())
+        if self.since_decode < self.step_seconds * SAMPLE_RATE:
+            return [], []
+        self.since_decode = 0
+
+        if not self._has_speech(self.buffer):
+            # Nothing to decode; keep only a short tail so a word onset isn't lost.
+            self._trim(self.buffer_end - 0.5)
+            self.hypothesis = []
+            return [], []
+
+        words = self._decode()
+        if self._trailing_silence():
+            # End of an utterance: everything decoded is final.
+            stable = self._commit(words)
+            self._reset()
+            return stable, []
+
+        # LocalAgreement: commit the prefix two consecutive decodes agree on.
+        agreed = 0
+        while (agreed < len(words) and agreed < len(self.hypothesis)
+               and _norm(words[agreed]["word"]) == _norm(self.hypothesis[agreed]["word"])):
+            agreed += 1
+        if len(self.buffer) / SAMPLE_RATE > self.max_buffer_seconds:
+            # Bound latency: force out everything but the last segment.
+            last_segment = words[-1]["segment"] if words else 0
+            forced = len([w for w in words if w["segment"] != last_segment])
+            agreed = max(agreed, forced)
+            if agreed == 0:
+                self._trim(self.buffer_end - self.max_buffer_seconds)
+
+        stable = self._commit(words[:agreed])
+        self.hypothesis = words[agreed:]
+        return stable, self._to_segments(self.hypothesis)
+
+    def _reset(self, gap_samples=0):
+        # Empties the buffer while keeping stream time continuous.
+        self.buffer_start = self.buffer_end + gap_samples / SAMPLE_RATE
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.hypothesis = []
+
+    def skip(self, n_samples):
+        # Audio dropped upstream: uncommitted text is abandoned, time moves on.
+        self._reset(n_samples)
+
+    def flush(self):
+        stable = []
+        if len(self.buffer) and self._has_speech(self.buffer):
+            stable = self._commit(self._decode())
+        self._reset()
+        return stable
+
+
+def run(source, transcriber, on_update, max_queue_seconds=30.0):
+    # Reads the source on its own thread so capture never waits on decoding;
+    # frames that arrive during a decode are fed together afterwards. If the
+    # backlog exceeds max_queue_seconds, the oldest frames are dropped.
+    cond = threading.Condition()
+    pending = deque()
+    state = {"queued": 0, "dropped": 0, "done": False}
+
+    def pump():
+        try:
+            for frame in source:
+                with cond:
+                    pending.append(frame)
+                    state["queued"] += len(frame)
+                    while state["queued"] > max_queue_seconds * SAMPLE_RATE and len(pending) > 1:
+                        dropped = len(pending.popleft())
+                        state["queued"] -= dropped
+                        state["dropped"] += dropped
+                    cond.notify()
+        finally:
+            with cond:
+                state["done"] = True
+                cond.notify()
+
+    threading.Thread(target=pump, name="realtime-source", daemon=True).start()
+    while True:
+        with cond:
+            while not pending and not state["done"]:
+                cond.wait()
+            if not pending:
+                break
+            batch = list(pending)
+            pending.clear()
+            dropped = state["dropped"]
+            state["queued"] = state["dropped"] = 0
+        if dropped:
+            transcriber.skip(dropped)
+        stable, provisional = transcriber.feed(np.concatenate(batch))
+        if stable or provisional:
+            on_update(stable, provisional)
+    on_update(transcriber.flush(), [])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Real-time transcription of a live audio source")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--wav", help="replay a media file at real-time speed")
+    source.add_argument("--pipe", help="named pipe or '-' with raw s16le 16 kHz mono PCM")
+    source.add_argument("--mic", action="store_true", help="default microphone")
+    parser.add_argument("--device", default=None, help="microphone device name or index")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--language", default=None)
+    parser.add_argument("--step", type=float, default=1.0, help="seconds between decodes")
+    parser.add_argument("--max-buffer", type=float, default=15.0, help="max seconds before text is forced stable")
+    parser.add_argument("--max-queue", type=float, default=30.0, help="max seconds of unprocessed audio")
+    parser.add_argument("--speech-detector", choices=["energy", "vad"], default="energy",
+                        help="loudness gate, or the Silero VAD (also rejects music and noise)")
+    parser.add_argument("--speech-threshold-db", type=float, default=None,
+                        help="fixed loudness gate in dBFS (default: 10 dB over the noise floor)")
+    args = parser.parse_args(argv)
+
+    if args.wav:
+        frames = wav_file_source(args.wav)
+    elif args.pipe:
+        frames = pipe_source(args.pipe)
+    else:
+        frames = microphone_source(args.device)
+
+    model = model_cache.get_model(args.model, device="cpu", compute_type="int8")
+    engine = StreamingTranscriber(model, language=args.language, step_seconds=args.step,
+                                  max_buffer_seconds=args.max_buffer, speech_detector=args.speech_detector,
+                                  speech_threshold_db=args.speech_threshold_db)
+
+    def on_update(stable, provisional):
+        for seg in stable:
+            print(f"\r[{seg['start']:8.2f} - {seg['end']:8.2f}] {seg['text']}\033[K")
+        pending = " ".join(seg["text"] for seg in provisional)
+        print(f"\r... {pending}\033[K", end="", flush=True)
+
+    try:
+        run(frames, engine, on_update, max_queue_seconds=args.max_queue)
+    except KeyboardInterrupt:
+        pass
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import cpu_tuning
+import model_cache
+
+# ==============================
+# Cross-session admission control
+# ==============================
+# Every Streamlit session runs its script in its own thread of the same server
+# process, so a module-level scheduler sees all of them. Jobs are admitted in
+# strict FIFO order while the weighted slot total, the threads of the running
+# jobs (against the cores the host's load leaves us, see cpu_tuning) and the
+# memory of the models in use stay within limits; the rest wait with a
+# visible position and are re-checked as jobs finish and the load changes.
+
+# Relative CPU cost of one decode per model size.
+MODEL_WEIGHTS = {
+    "tiny": 1,
+    "base": 1,
+    "small": 2,
+    "medium": 3,
+    "large": 4,
+}
+
+# One slot per threads-per-decode worth of usable cores (affinity, cgroup quota).
+DEFAULT_MAX_SLOTS = int(os.environ.get("SCHEDULER_MAX_SLOTS", str(cpu_tuning.tuner.default_workers())))
+DEFAULT_MEMORY_MB = int(os.environ.get("SCHEDULER_MEMORY_MB", str(model_cache.DEFAULT_BUDGET_MB)))
+
+
+def job_weight(model_size, engine="standard", workers=1, max_slots=DEFAULT_MAX_SLOTS):
+    weight = MODEL_WEIGHTS.get(model_size.split(".")[0].split("-")[0], MODEL_WEIGHTS["large"])
+    if engine == "chunked":
+        weight *= workers
+    # A job heavier than the whole box still runs, just alone.
+    return min(weight, max_slots)
+
+
+class Ticket:
+    def __init__(self, ticket_id, model_size, compute_type, weight, threads=1):
+        self.id = ticket_id
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.weight = weight
+        self.threads = threads
+        self.enqueued = time.time()
+        self.admitted = None
+
+
+class Scheduler:
+    def __init__(self, max_slots=DEFAULT_MAX_SLOTS, memory_budget_mb=DEFAULT_MEMORY_MB, tuner=cpu_tuning.tuner):
+        self.max_slots = max_slots
+        self.memory_budget_mb = memory_budget_mb
+        self.tuner = tuner
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._running = []
+        self._ids = itertools.count(1)
+
+    def _models_mb(self, tickets):
+        models = {(t.model_size, t.compute_type) for t in tickets}
+        return sum(model_cache.estimate_model_mb(size, ct) for size, ct in models)
+
+    def _can_admit_locked(self, ticket):
+        if self._waiting[0] is not ticket:
+            return False
+        if not self._running:
+            return True
+        slots = sum(t.weight for t in self._running) + ticket.weight
+        threads = sum(t.threads for t in self._running) + ticket.threads
+        memory = self._models_mb(self._running + [ticket])
+        return (slots <= self.max_slots and threads <= self.tuner.usable_cores()
+                and memory <= self.memory_budget_mb)
+
+    def position(self, ticket):
+        with self._cond:
+            return self._waiting.index(ticket) + 1 if ticket in self._waiting else 0
+
+    @contextmanager
+    def acquire(self, model_size, compute_type="int8", engine="standard", workers=1, on_wait=None):
+        # on_wait(position) is called from the waiting thread about once a second.
+        weight = job_weight(model_size, engine, workers, self.max_slots)
+        ticket = Ticket(next(self._ids), model_size, compute_type, weight,
+                        self.tuner.job_threads(engine, workers))
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while not self._can_admit_locked(ticket):
+                    if on_wait:
+                        on_wait(self._waiting.index(ticket) + 1)
+                    self._cond.wait(timeout=1.0)
+            except BaseException:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+                raise
+            self._waiting.remove(ticket)
+            self._running.append(ticket)
+            ticket.admitted = time.time()
+            # The next job in line may fit alongside this one.
+            self._cond.notify_all()
+        try:
+            yield ticket
+        finally:
+            with self._cond:
+                self._running.remove(ticket)
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "running": len(self._running),
+                "waiting": len(self._waiting),
+                "slots_in_use": sum(t.weight for t in self._running),
+                "max_slots": self.max_slots,
+                "threads_in_use": sum(t.threads for t in self._running),
+                "usable_cores": self.tuner.usable_cores(),
+                "memory_mb": self._models_mb(self._running),
+                "memory_budget_mb": self.memory_budget_mb,
+            }
+
+
+# Process-wide instance shared by all sessions.
+scheduler = Scheduler()
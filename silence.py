@@ -0,0 +1,174 @@
+import numpy as np
+
+# ==============================
+# Energy-based silence detection
+# ==============================
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+
+def frame_energy(audio, sampling_rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    # Mean power per non-overlapping frame; the tail shorter than a frame is dropped.
+    frame = int(sampling_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    return np.einsum("ij,ij->i", frames, frames) / frame
+
+
+def split_at_silence(audio, window_seconds, search_seconds=None, sampling_rate=SAMPLE_RATE):
+    # Returns sample offsets [0, c1, ..., len(audio)] where each cut lies in the
+    # quietest ~300 ms stretch within +/- search_seconds of a window boundary.
+    total = len(audio)
+    window = int(window_seconds * sampling_rate)
+    if total <= window:
+        return [0, total]
+
+    if search_seconds is None:
+        search_seconds = min(window_seconds * 0.1, 30.0)
+
+    frame = int(sampling_rate * FRAME_MS / 1000)
+    energy = frame_energy(audio, sampling_rate)
+    smooth = max(1, 300 // FRAME_MS)
+    energy = np.convolve(energy, np.ones(smooth) / smooth, mode="same")
+    search = int(search_seconds * 1000 / FRAME_MS)
+
+    cuts = [0]
+    target = window
+    while target < total - window // 4:
+        centre = target // frame
+        lo = max(cuts[-1] // frame + 1, centre - search)
+        hi = min(len(energy), centre + search + 1)
+        if hi > lo:
+            cut = (lo + int(np.argmin(energy[lo:hi]))) * frame
+        else:
+            cut = target
+        cuts.append(cut)
+        target = cut + window
+    cuts.append(total)
+    return cuts
+
+
+# ==============================
+# Non-speech trimming
+# ==============================
+# Long silent or music-only stretches are cut out before decoding. An energy
+# gate drops silence in a single vectorized pass; with method="vad", the
+# regions that survive it are checked again by the Silero VAD bundled with
+# faster-whisper, which also rejects music and noise. OffsetMap takes times
+# in the trimmed audio back to original media time.
+
+def _runs(mask):
+    # (start, end) index pairs of the True runs in a boolean array.
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def frame_db(audio, sampling_rate=SAMPLE_RATE):
+    return 10 * np.log10(frame_energy(audio, sampling_rate) + 1e-12)
+
+
+def adaptive_threshold_db(db):
+    # 10 dB over the noise floor (10th percentile frame), kept between -60
+    # and -35 dBFS.
+    return float(np.clip(np.percentile(db, 10) + 10, -60, -35))
+
+
+def energy_regions(audio, min_silence_seconds=1.0, threshold_db=None, sampling_rate=SAMPLE_RATE):
+    # Sample ranges louder than an adaptive threshold (adaptive_threshold_db).
+    frame = int(sampling_rate * FRAME_MS / 1000)
+    db = frame_db(audio, sampling_rate)
+    if len(db) == 0:
+        return []
+    if threshold_db is None:
+        threshold_db = adaptive_threshold_db(db)
+    loud = db > threshold_db
+
+    # Quiet gaps shorter than min_silence_seconds stay; speech needs its pauses.
+    starts, ends = _runs(~loud)
+    short = (ends - starts) * FRAME_MS / 1000 < min_silence_seconds
+    interior = (starts > 0) & (ends < len(loud))
+    for s, e in zip(starts[short & interior], ends[short & interior]):
+        loud[s:e] = True
+
+    starts, ends = _runs(loud)
+    return [(int(s) * frame, min(len(audio), int(e) * frame)) for s, e in zip(starts, ends)]
+
+
+def vad_regions(audio, regions, min_silence_seconds=1.0, sampling_rate=SAMPLE_RATE):
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    options = VadOptions(min_silence_duration_ms=int(min_silence_seconds * 1000), speech_pad_ms=0)
+    speech = []
+    for lo, hi in regions:
+        for ts in get_speech_timestamps(audio[lo:hi], options, sampling_rate=sampling_rate):
+            speech.append((lo + ts["start"], lo + ts["end"]))
+    return speech
+
+
+def _pad_and_merge(regions, pad, total):
+    merged = []
+    for lo, hi in regions:
+        lo, hi = max(0, lo - pad), min(total, hi + pad)
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class OffsetMap:
+    def __init__(self, regions, total_samples, sampling_rate=SAMPLE_RATE):
+        self.regions = regions
+        bounds = np.array(regions, dtype=np.int64).reshape(-1, 2)
+        lengths = bounds[:, 1] - bounds[:, 0]
+        self.src_starts = bounds[:, 0] / sampling_rate
+        self.dst_starts = (np.cumsum(lengths) - lengths) / sampling_rate
+        self.original_seconds = total_samples / sampling_rate
+        self.kept_seconds = float(lengths.sum()) / sampling_rate
+
+    @property
+    def skipped_seconds(self):
+        return self.original_seconds - self.kept_seconds
+
+    def to_original(self, times, side="right"):
+        # side="left" maps a time on a cut to the end of the region before it,
+        # which is what segment and word end times need.
+        times = np.asarray(times, dtype=np.float64)
+        if len(self.src_starts) == 0:
+            # Nothing was kept: there is no trimmed time to map.
+            return times
+        index = np.clip(np.searchsorted(self.dst_starts, times, side=side) - 1, 0, len(self.dst_starts) - 1)
+        return self.src_starts[index] + (times - self.dst_starts[index])
+
+    def remap_results(self, results):
+        # Rewrites every segment and word timestamp in place.
+        items = []
+        for seg in results["segments"]:
+            items.append(seg)
+            items.extend(seg.get("words") or [])
+        if items:
+            starts = self.to_original([x["start"] for x in items], side="right")
+            ends = self.to_original([x["end"] for x in items], side="left")
+            for x, start, end in zip(items, starts.tolist(), ends.tolist()):
+                x["start"], x["end"] = start, end
+        return results
+
+
+def trim_non_speech(audio, method="vad", min_silence_seconds=1.0, pad_seconds=0.25,
+                    sampling_rate=SAMPLE_RATE):
+    # Returns (trimmed audio, OffsetMap).
+    regions = energy_regions(audio, min_silence_seconds, sampling_rate=sampling_rate)
+    if method == "vad":
+        regions = vad_regions(audio, regions, min_silence_seconds, sampling_rate)
+    regions = _pad_and_merge(regions, int(pad_seconds * sampling_rate), len(audio))
+    offsets = OffsetMap(regions, len(audio), sampling_rate)
+    if len(regions) == 1 and regions[0] == (0, len(audio)):
+        return audio, offsets
+    trimmed = np.empty(sum(hi - lo for lo, hi in regions), dtype=np.float32)
+    pos = 0
+    for lo, hi in regions:
+        trimmed[pos: pos + hi - lo] = audio[lo:hi]
+        pos += hi - lo
+    return trimmed, offsets
@@ -0,0 +1,181 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import audio_io
+import cpu_tuning
+import silence
+
+SAMPLE_RATE = 16000
+
+
+# -------------------------------
+# Segment conversion
+# -------------------------------
+def segment_to_dict(segment, words=None):
+    words = segment.words if words is None else words
+    seg_data = {
+        "start": segment.start,
+        "end": segment.end,
+        "text": segment.text.strip(),
+        "words": []
+    }
+    if words:
+        for w in words:
+            seg_data["words"].append({
+                "start": w.start,
+                "end": w.end,
+                "text": w.word.strip()
+            })
+    return seg_data
+
+
+# -------------------------------
+# Sequential transcription (one model call over the whole file)
+# -------------------------------
+def _collect(segments, info, duration=None, on_progress=None, on_segment=None):
+    # on_segment(seg_data) sees each segment as soon as it is decoded.
+    duration = duration or info.duration
+
+    results = {"language": info.language, "segments": []}
+    for segment in segments:
+        seg_data = segment_to_dict(segment)
+        results["segments"].append(seg_data)
+        if on_segment:
+            on_segment(seg_data)
+        if on_progress and duration:
+            on_progress(min(segment.end / duration, 1.0))
+    return results
+
+
+def transcribe(model, audio, language=None, duration=None, on_progress=None, on_segment=None):
+    segments, info = model.transcribe(audio, word_timestamps=True, language=language)
+    return _collect(segments, info, duration, on_progress, on_segment)
+
+
+# -------------------------------
+# Batched mode: VAD-split speech decoded batch_size windows at a time
+# -------------------------------
+def transcribe_batched(model, audio, language=None, batch_size=8, duration=None,
+                       on_progress=None, on_segment=None):
+    from faster_whisper import BatchedInferencePipeline
+    pipeline = BatchedInferencePipeline(model)
+    segments, info = pipeline.transcribe(
+        audio, word_timestamps=True, language=language, batch_size=batch_size
+    )
+    return _collect(segments, info, duration, on_progress, on_segment)
+
+
+# -------------------------------
+# Long-file mode: parallel transcription of silence-aligned windows
+# -------------------------------
+def default_workers():
+    # One window per threads-per-decode worth of usable cores.
+    return cpu_tuning.tuner.default_workers()
+
+
+def _stitch_window(segments, offset, core_start, core_end):
+    # Keep only words whose midpoint falls in this window's core, so each word
+    # in the overlap is emitted by exactly one window.
+    kept_segments = []
+    for segment in segments:
+        segment.start += offset
+        segment.end += offset
+        if not segment.words:
+            mid = (segment.start + segment.end) / 2
+            if core_start <= mid < core_end:
+                kept_segments.append(segment_to_dict(segment))
+            continue
+
+        for w in segment.words:
+            w.start += offset
+            w.end += offset
+        words = [w for w in segment.words if core_start <= (w.start + w.end) / 2 < core_end]
+        if not words:
+            continue
+        if len(words) < len(segment.words):
+            segment.start = words[0].start
+            segment.end = words[-1].end
+            segment.text = "".join(w.word for w in words)
+        kept_segments.append(segment_to_dict(segment, words))
+    return kept_segments
+
+
+def transcribe_chunked(model, audio, language=None, window_seconds=300, overlap_seconds=5,
+                       workers=None, on_progress=None, on_segment=None, checkpoint=None):
+    # checkpoint (checkpoints.Checkpoint) records each finished window and
+    # supplies the ones a previous, interrupted run already finished.
+    if isinstance(audio, str):
+        audio = audio_io.decode_audio(audio, sampling_rate=SAMPLE_RATE)
+    workers = workers or default_workers()
+
+    cuts = silence.split_at_silence(audio, window_seconds)
+    if checkpoint is not None and checkpoint.matches(cuts, language):
+        language = checkpoint.header["language"]
+    else:
+        # Windows transcribed independently must agree on a language.
+        if language is None:
+            language, _, _ = model.detect_language(audio)
+        if checkpoint is not None:
+            checkpoint.start(language, cuts)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    total = len(audio)
+
+    def run_window(index):
+        core_start, core_end = cuts[index], cuts[index + 1]
+        lo = max(0, core_start - overlap)
+        hi = min(total, core_end + overlap)
+        segments, _ = model.transcribe(
+            audio[lo:hi],
+            word_timestamps=True,
+            language=language,
+            condition_on_previous_text=False,
+        )
+        stitched = _stitch_window(
+            list(segments),
+            lo / SAMPLE_RATE,
+            core_start / SAMPLE_RATE,
+            core_end / SAMPLE_RATE if core_end < total else float("inf"),
+        )
+        if checkpoint is not None:
+            checkpoint.commit(index, stitched)
+        return stitched
+
+    window_results = [None] * (len(cuts) - 1)
+    done_samples = 0
+    if checkpoint is not None:
+        for i, segments in checkpoint.windows.items():
+            window_results[i] = segments
+            done_samples += cuts[i + 1] - cuts[i]
+    emitted = 0
+
+    def emit_ready():
+        # Windows finish out of order; emit segments once every earlier window is done.
+        nonlocal emitted
+        while on_segment and emitted < len(window_results) and window_results[emitted] is not None:
+            for seg_data in window_results[emitted]:
+                on_segment(seg_data)
+            emitted += 1
+
+    emit_ready()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {pool.submit(run_window, i): i for i, r in enumerate(window_results) if r is None}
+    try:
+        for future in as_completed(futures):
+            i = futures[future]
+            window_results[i] = future.result()
+            done_samples += cuts[i + 1] - cuts[i]
+            emit_ready()
+            if on_progress:
+                on_progress(done_samples / total)
+    except BaseException:
+        # Interrupted (e.g. a Streamlit rerun): queued windows are dropped and
+        # the running ones finish and reach the checkpoint before the caller
+        # releases its checkpoint lock, scheduler slot and CPU lease, so no
+        # decode outlives them and a resumed run never repeats one in flight.
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+    results = {"language": language, "segments": []}
+    for window_segments in window_results:
+        results["segments"].extend(window_segments)
+    return results
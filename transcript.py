@@ -0,0 +1,298 @@
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+# pandas and pyarrow are imported where a table is built, so pages that
+# never show one do not pay for them.
+
+
+# ==============================
+# Chunking engine
+# ==============================
+# Rows of several words are cut greedily: a chunk that starts at word i runs
+# until the first word that would break one of the limits (word count,
+# duration, characters) or that starts a new group (after a long pause, or a
+# new segment unless chunks may cross segments). Where every possible chunk
+# starting at each word would stop is computed for all words at once with
+# searchsorted; only the hop from one chunk to the next is a loop, over a
+# plain list and once per chunk rather than per word.
+Chunking = namedtuple(
+    "Chunking", ["words", "seconds", "chars", "pause", "cross_segments"],
+    defaults=[None, None, None, None, False]
+)
+
+
+def as_chunking(chunk_size):
+    # `chunk_size` is a word count (the original option), a Chunking, or None.
+    # Returns None when no limit is set.
+    if isinstance(chunk_size, Chunking):
+        if chunk_size.words or chunk_size.seconds or chunk_size.chars or chunk_size.pause:
+            return chunk_size
+        return None
+    return Chunking(words=int(chunk_size)) if chunk_size else None
+
+
+def chunk_words(word_start, word_end, rule, char_pos=None, group_first=None):
+    # Returns the index of the first word of every chunk. char_pos[i] is the
+    # character offset of word i in the space-joined word text (n + 1 entries,
+    # needed for rule.chars); group_first lists words that must start a chunk.
+    n = len(word_start)
+    index = np.arange(n)
+    starts_group = np.zeros(n, dtype=bool)
+    if group_first is not None:
+        group_first = np.asarray(group_first, dtype=np.int64)
+        starts_group[group_first[group_first < n]] = True  # trailing empty segments point at n
+    if rule.pause and n > 1:
+        starts_group[1:] |= word_start[1:] - word_end[:-1] >= rule.pause
+    if n:
+        starts_group[0] = True
+
+    if not (rule.seconds or rule.chars):
+        # Word count and groups only: every rule.words-th word of its group,
+        # no walk needed.
+        if not rule.words:
+            return np.flatnonzero(starts_group)
+        group_start = np.maximum.accumulate(np.where(starts_group, index, 0))
+        return np.flatnonzero((index - group_start) % rule.words == 0)
+
+    stop = np.full(n, n, dtype=np.int64)  # chunk from word i is [i, stop[i])
+    if rule.words:
+        np.minimum(stop, index + rule.words, out=stop)
+    if rule.seconds:
+        # The chunk [i, j) lasts end[j - 1] - start[i]; ends are made
+        # non-decreasing so they can be searched.
+        ends = np.maximum.accumulate(word_end)
+        np.minimum(stop, np.searchsorted(ends, word_start + rule.seconds, side="right"), out=stop)
+    if rule.chars:
+        # The chunk [i, j) has char_pos[j] - char_pos[i] - 1 characters.
+        fits = np.searchsorted(char_pos, char_pos[:-1] + rule.chars + 1, side="right") - 1
+        np.minimum(stop, fits, out=stop)
+
+    # The next group start after each word, by a reversed running minimum.
+    following = np.append(np.where(starts_group[1:], index[1:], n), n)
+    np.minimum(stop, np.minimum.accumulate(following[::-1])[::-1], out=stop)
+    # A single word over a limit still makes a chunk of its own.
+    np.maximum(stop, index + 1, out=stop)
+
+    firsts, hops, i = [], memoryview(stop), 0  # memoryview: no list of n ints
+    while i < n:
+        firsts.append(i)
+        i = hops[i]
+    return np.array(firsts, dtype=np.int64)
+
+
+# -------------------------------
+# Format transcription for CSV
+# -------------------------------
+def format_transcription_for_csv(transcription_results, include_words=False, chunk_size=None):
+    # Row dicts for callers that want plain Python data; built from the same
+    # columnar views as the table and the exports.
+    transcript = Transcript.from_results(transcription_results or {})
+    start, end, lo, hi = transcript.rows(include_words, chunk_size)
+    # Shortest float32 repr, so 0.3 stays 0.3 rather than 0.30000001
+    return [
+        {"start_time": s, "end_time": e, "text": t}
+        for s, e, t in zip(
+            start.astype(str).astype(np.float64).tolist(), end.astype(str).astype(np.float64).tolist(),
+            transcript.texts(lo, hi)
+        )
+    ]
+
+
+# ==============================
+# Columnar transcript
+# ==============================
+# All text lives in one UTF-8 buffer: segment texts back to back, followed by
+# every word text with a single space after it. A chunk of consecutive words is
+# then one contiguous byte range whose text is already " "-joined, so every
+# view is just (start, end, byte_lo, byte_hi) arrays plus one gather.
+class Transcript:
+    __slots__ = (
+        "language",
+        "seg_start", "seg_end", "seg_bounds",
+        "word_start", "word_end", "word_bounds",
+        "word_offsets", "text",
+    )
+
+    def __init__(self, language, seg_start, seg_end, seg_bounds,
+                 word_start, word_end, word_bounds, word_offsets, text):
+        self.language = language
+        self.seg_start = seg_start        # float32 [n_segments]
+        self.seg_end = seg_end            # float32 [n_segments]
+        self.seg_bounds = seg_bounds      # int64 [n_segments + 1] byte offsets
+        self.word_start = word_start      # float32 [n_words]
+        self.word_end = word_end          # float32 [n_words]
+        self.word_bounds = word_bounds    # int64 [n_words + 1]; word i is [b[i], b[i+1] - 1)
+        self.word_offsets = word_offsets  # int64 [n_segments + 1] first word of each segment
+        self.text = text                  # uint8 buffer
+
+    @classmethod
+    def from_results(cls, results):
+        seg_start, seg_end = array("f"), array("f")
+        word_start, word_end = array("f"), array("f")
+        word_counts = array("q")
+        seg_texts, word_texts = [], []
+
+        for segment in results.get("segments", []):
+            seg_start.append(segment["start"])
+            seg_end.append(segment["end"])
+            seg_texts.append(segment["text"].strip().encode("utf-8"))
+            words = segment.get("words") or []
+            word_counts.append(len(words))
+            for w in words:
+                word_start.append(w["start"])
+                word_end.append(w["end"])
+                word_texts.append(w["text"].encode("utf-8"))
+
+        seg_bounds = np.zeros(len(seg_texts) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, seg_texts), np.int64, len(seg_texts)), out=seg_bounds[1:])
+        word_bounds = np.empty(len(word_texts) + 1, dtype=np.int64)
+        word_bounds[0] = seg_bounds[-1]
+        np.cumsum(np.fromiter(map(len, word_texts), np.int64, len(word_texts)) + 1, out=word_bounds[1:])
+        word_bounds[1:] += seg_bounds[-1]
+        word_offsets = np.zeros(len(word_counts) + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(word_counts, np.int64), out=word_offsets[1:])
+
+        blob = b"".join(seg_texts)
+        if word_texts:
+            blob += b" ".join(word_texts) + b" "
+
+        return cls(
+            results.get("language"),
+            np.frombuffer(seg_start, np.float32), np.frombuffer(seg_end, np.float32), seg_bounds,
+            np.frombuffer(word_start, np.float32), np.frombuffer(word_end, np.float32), word_bounds,
+            word_offsets, np.frombuffer(blob, np.uint8),
+        )
+
+    @property
+    def n_segments(self):
+        return len(self.seg_start)
+
+    @property
+    def n_words(self):
+        return len(self.word_start)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.__slots__ if name != "language")
+
+    def _str(self, lo, hi):
+        return self.text[lo:hi].tobytes().decode("utf-8")
+
+    def to_results(self):
+        segments = []
+        for i in range(self.n_segments):
+            words = [
+                {
+                    "start": float(self.word_start[j]),
+                    "end": float(self.word_end[j]),
+                    "text": self._str(self.word_bounds[j], self.word_bounds[j + 1] - 1),
+                }
+                for j in range(self.word_offsets[i], self.word_offsets[i + 1])
+            ]
+            segments.append({
+                "start": float(self.seg_start[i]),
+                "end": float(self.seg_end[i]),
+                "text": self._str(self.seg_bounds[i], self.seg_bounds[i + 1]),
+                "words": words,
+            })
+        return {"language": self.language, "segments": segments}
+
+    # -------------------------------
+    # Views: (start, end, byte_lo, byte_hi) per output row
+    # -------------------------------
+    def rows(self, include_words=False, chunk_size=None):
+        # Chunks win over word rows, and segments without words always fall
+        # back to one row. chunk_size is a word count or a Chunking.
+        rule = as_chunking(chunk_size)
+        counts = np.diff(self.word_offsets)
+        if not (rule or include_words) or self.n_words == 0:
+            return self.seg_start, self.seg_end, self.seg_bounds[:-1], self.seg_bounds[1:]
+
+        rule = rule or Chunking(words=1)
+        first = chunk_words(
+            self.word_start, self.word_end, rule,
+            char_pos=self._word_char_pos() if rule.chars else None,
+            group_first=None if rule.cross_segments else self.word_offsets[:-1],
+        )
+        last = np.append(first[1:], self.n_words) - 1
+
+        start = self.word_start[first]
+        end = self.word_end[last]
+        lo = self.word_bounds[first]
+        hi = self.word_bounds[last + 1] - 1
+
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            word_seg = np.repeat(np.arange(self.n_segments), counts)
+            seg_ids = np.concatenate([word_seg[first], empty])
+            order = np.argsort(seg_ids, kind="stable")
+            start = np.concatenate([start, self.seg_start[empty]])[order]
+            end = np.concatenate([end, self.seg_end[empty]])[order]
+            lo = np.concatenate([lo, self.seg_bounds[empty]])[order]
+            hi = np.concatenate([hi, self.seg_bounds[empty + 1]])[order]
+        return start, end, lo, hi
+
+    def _word_char_pos(self):
+        # Character offset of each word in the space-joined word text (n + 1
+        # entries); UTF-8 continuation bytes do not count.
+        words = self.text[self.word_bounds[0]:]
+        offsets = self.word_bounds - self.word_bounds[0]
+        if not len(words) or words.max() < 128:
+            return offsets
+        chars = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum((words & 0xC0) != 0x80, out=chars[1:])
+        return chars[offsets]
+
+    def _gather_text(self, lo, hi):
+        # Packs the byte ranges into (offsets, data) for an Arrow string array.
+        lengths = hi - lo
+        offsets = np.zeros(len(lo) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if len(lo) == 0:
+            return offsets, self.text[:0]
+        if np.array_equal(lo[1:], hi[:-1]):
+            # Ranges are already contiguous (segment view): no copy.
+            return offsets, self.text[lo[0]:hi[-1]]
+        index = np.repeat(lo - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return offsets, self.text[index]
+
+    def text_array(self, lo, hi):
+        import pyarrow as pa
+        offsets, data = self._gather_text(lo, hi)
+        return pa.Array.from_buffers(
+            pa.large_string(), len(lo), [None, pa.py_buffer(offsets), pa.py_buffer(data)]
+        )
+
+    def texts(self, lo, hi):
+        # The byte ranges as a list of str, decoding the gathered bytes once
+        # when they are all ASCII (byte offsets are then character offsets).
+        offsets, data = self._gather_text(lo, hi)
+        raw = data.tobytes()
+        bounds = offsets.tolist()
+        if not len(data) or data.max() < 128:
+            raw = raw.decode("ascii")
+            return [raw[a:b] for a, b in zip(bounds, bounds[1:])]
+        return [raw[a:b].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+
+    def to_arrow(self, include_words=False, chunk_size=None):
+        import pyarrow as pa
+        start, end, lo, hi = self.rows(include_words, chunk_size)
+        return pa.table({
+            "start_time": pa.array(start),
+            "end_time": pa.array(end),
+            "text": self.text_array(lo, hi),
+        })
+
+    def to_dataframe(self, include_words=False, chunk_size=None):
+        import pandas as pd
+        start, end, lo, hi = self.rows(include_words, chunk_size)
+        return pd.DataFrame(
+            {
+                "start_time": start,
+                "end_time": end,
+                "text": pd.arrays.ArrowExtensionArray(self.text_array(lo, hi)),
+            },
+            copy=False,
+        )
@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+# ==============================
+# On-disk transcript cache
+# ==============================
+# Results are stored as gzipped JSON, one file per key. Writes go through a
+# temp file + os.replace, so several server processes can share a directory
+# and readers never see a partial entry. Reads bump the file's mtime, which
+# makes mtime the LRU clock for eviction.
+
+CACHE_DIR = os.environ.get(
+    "TRANSCRIPT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "transcription_app", "transcripts"),
+)
+MAX_BYTES = int(float(os.environ.get("TRANSCRIPT_CACHE_MAX_MB", "512")) * 1024 * 1024)
+TTL_SECONDS = float(os.environ.get("TRANSCRIPT_CACHE_TTL_DAYS", "30")) * 86400
+
+HASH_CHUNK = 1024 * 1024
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(content_hash, model_size, language, engine, **options):
+    # Options that change the output (window length, batch size, ...) belong in
+    # the key; options that only change speed (worker count) do not.
+    payload = json.dumps(
+        {
+            "content": content_hash,
+            "model": model_size,
+            "language": language,
+            "engine": engine,
+            "options": options,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.json.gz")
+
+
+def get(key, cache_dir=None):
+    path = _entry_path(key, cache_dir or CACHE_DIR)
+    try:
+        if time.time() - os.path.getmtime(path) > TTL_SECONDS:
+            os.remove(path)
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            results = json.load(f)
+        os.utime(path)
+        return results
+    except (FileNotFoundError, OSError, ValueError):
+        # Missing, concurrently evicted, or unreadable: treat as a miss.
+        return None
+
+
+def put(key, results, cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            f.write(json.dumps(results, ensure_ascii=False).encode("utf-8"))
+        os.replace(tmp_path, _entry_path(key, cache_dir))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    evict(cache_dir)
+
+
+def evict(cache_dir=None, max_bytes=None):
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    now = time.time()
+
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".json.gz"):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in entries:
+        if total <= max_bytes and now - mtime <= TTL_SECONDS:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # another process got there first
+        total -= size
@@ -0,0 +1,296 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import audio_io
+import exports
+import metrics
+import pipeline
+import uploads
+from transcript import Chunking, Transcript, as_chunking
+
+# ==============================
+# Local HTTP transcription service
+# ==============================
+# POST /jobs?filename=talk.mp4&model=base&language=en&trim=vad   body: raw media bytes
+#   (language=auto detects it from short samples of the file)
+#   -> 202 {"id": ...}, or 503 when the queue is full
+# GET  /jobs/<id>                                        -> status and progress
+# GET  /jobs/<id>/result?format=json|csv|jsonl|srt|vtt&chunk_size=8&include_words=0
+#        &max_seconds=6&max_chars=42&pause=0.8&cross_segments=1   (row limits, all optional)
+# GET  /health
+# GET  /metrics                                          -> Prometheus text format
+#
+# Usage: python transcription_service.py --port 8502 --workers 2 --queue-size 16
+
+MAX_UPLOAD_BYTES = int(float(os.environ.get("SERVICE_MAX_UPLOAD_MB", "4096")) * 1024 * 1024)
+
+
+class Job:
+    def __init__(self, upload, options):
+        self.id = uuid.uuid4().hex
+        self.upload = upload
+        self.options = options
+        self.status = "queued"
+        self.progress = 0.0
+        self.error = None
+        self.transcript = None
+        self.created = time.time()
+        self.finished = None
+        self.metrics = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "error": self.error,
+            "language": self.transcript.language if self.transcript else None,
+            "sha256": self.upload.sha256,
+            "created": self.created,
+            "finished": self.finished,
+            "metrics": self.metrics,
+        }
+
+
+def run_pipeline(upload, options, on_progress):
+    if uploads.is_streamable(upload.path):
+        # Decoding follows the upload as it arrives instead of waiting for it.
+        with upload.reader() as reader, metrics.stage("extract_audio"):
+            audio = audio_io.decode_audio(reader)
+    else:
+        with metrics.stage("upload_write"):
+            upload.wait()
+        audio = pipeline.load_audio(upload.path)
+    if audio is None:
+        raise ValueError("no audio track")
+    return pipeline.transcribe_audio(
+        audio, model_size=options.get("model", "base"), language=options.get("language"),
+        engine=options.get("engine", "standard"), batch_size=int(options.get("batch_size", 8)),
+        trim=options.get("trim") or None, content_hash=upload.sha256,
+        on_progress=on_progress
+    )
+
+
+class JobQueue:
+    # Bounded queue in front of a fixed pool of worker threads that share the
+    # cached model. `transcribe` is injectable so the service can be exercised
+    # offline without model weights.
+    def __init__(self, workers=1, queue_size=16, keep_finished=256, transcribe=run_pipeline):
+        self.workers = workers
+        self.transcribe = transcribe
+        self.keep_finished = keep_finished
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"transcribe-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def full(self):
+        return self._queue.full()
+
+    def submit(self, upload, options):
+        job = Job(upload, options)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            return None
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune_locked()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job):
+        with self._lock:
+            queued = [j for j in self._jobs.values() if j.status == "queued"]
+        return queued.index(job) + 1 if job in queued else 0
+
+    def _prune_locked(self):
+        finished = [j for j in self._jobs.values() if j.finished is not None]
+        for job in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.status = "running"
+            job_metrics = metrics.JobMetrics(
+                source="service", model=job.options.get("model", "base"),
+                engine=job.options.get("engine", "standard")
+            ).start()
+            try:
+                def on_progress(fraction):
+                    job.progress = fraction
+                results = self.transcribe(job.upload, job.options, on_progress)
+                job.transcript = Transcript.from_results(results)
+                job.progress = 1.0
+                job.status = "done"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.metrics = job_metrics.finish(status="ok" if job.status == "done" else "failed")
+                job.finished = time.time()
+                if os.path.exists(job.upload.path):
+                    os.remove(job.upload.path)
+                self._queue.task_done()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    jobs = None  # set by make_server
+    timeout = 300  # a stalled upload must not hold a worker forever
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, status, chunks, content_type):
+        # Without a Content-Length, HTTP/1.0 ends the body when the connection closes.
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.end_headers()
+        self.close_connection = True
+        for chunk in chunks:
+            self.wfile.write(chunk)
+
+    def log_message(self, format, *args):
+        pass  # keep stdout for the startup banner
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if parts == ["health"]:
+            return self._send(200, {"status": "ok", "queue_full": self.jobs.full()})
+        if parts == ["metrics"]:
+            return self._send(200, metrics.registry.render().encode("utf-8"), "text/plain; version=0.0.4")
+        if len(parts) < 2 or parts[0] != "jobs":
+            return self._send(404, {"error": "not found"})
+
+        job = self.jobs.get(parts[1])
+        if job is None:
+            return self._send(404, {"error": "unknown job"})
+        if len(parts) == 2:
+            return self._send(200, {**job.to_dict(), "queue_position": self.jobs.queue_position(job)})
+        if parts[2:] != ["result"]:
+            return self._send(404, {"error": "not found"})
+        if job.status != "done":
+            return self._send(409, job.to_dict())
+
+        fmt = query.get("format", "json")
+        if fmt == "json":
+            return self._send(200, job.transcript.to_results())
+        if fmt in exports.WRITERS:
+            try:
+                chunking = as_chunking(Chunking(
+                    int(query.get("chunk_size", "0")) or None,
+                    float(query.get("max_seconds", "0")) or None,
+                    int(query.get("max_chars", "0")) or None,
+                    float(query.get("pause", "0")) or None,
+                    query.get("cross_segments", "0") in ("1", "true"),
+                ))
+            except ValueError:
+                return self._send(400, {"error": "row limits must be numbers"})
+            options = {
+                "include_words": query.get("include_words", "0") in ("1", "true"),
+                "chunk_size": chunking,
+            }
+            if fmt == "csv":
+                options["bom"] = False
+            return self._send_stream(
+                200, exports.WRITERS[fmt](job.transcript, **options),
+                f"{exports.FORMATS[fmt][1]}; charset=utf-8"
+            )
+        return self._send(400, {"error": f"format must be json or one of {', '.join(exports.WRITERS)}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found"})
+        options = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            return self._send(411, {"error": "Content-Length required"})
+        if length > MAX_UPLOAD_BYTES:
+            return self._send(413, {"error": "upload too large"})
+        # Reject before reading the body, so a saturated server does not buffer uploads.
+        if self.jobs.full():
+            self.close_connection = True
+            return self._send(503, {"error": "queue full"}, headers={"Retry-After": "30"})
+
+        # Streamable formats are queued before the body is read, so an idle
+        # worker can start decoding while the upload is still arriving. Other
+        # containers (MP4/MOV, MP3) need the whole file, so they are queued once it
+        # is written instead of holding a worker for the length of the upload.
+        upload = uploads.StreamingUpload(suffix=os.path.splitext(options.get("filename", ""))[1] or ".bin")
+        streamable = uploads.is_streamable(upload.path)
+        job = self.jobs.submit(upload, options) if streamable else None
+        if streamable and job is None:
+            upload.discard()
+            self.close_connection = True
+            return self._send(503, {"error": "queue full"}, headers={"Retry-After": "30"})
+
+        try:
+            upload.feed(self.rfile, length)
+        except Exception as e:
+            if job is None:
+                upload.discard()
+                return self._send(400, {"error": f"incomplete upload: {e}"})
+            return self._send(400, {"error": f"incomplete upload: {e}", "id": job.id})
+        if job is None:
+            job = self.jobs.submit(upload, options)
+            if job is None:
+                upload.discard()
+                return self._send(503, {"error": "queue full"}, headers={"Retry-After": "30"})
+        return self._send(202, {"id": job.id, "status": job.status})
+
+
+def make_server(host="127.0.0.1", port=8502, jobs=None):
+    handler = type("BoundServiceHandler", (ServiceHandler,), {"jobs": jobs or JobQueue()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP transcription service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, JobQueue(workers=args.workers, queue_size=args.queue_size))
+    pipeline.prewarm()
+    print(f"Transcription service listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
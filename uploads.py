@@ -0,0 +1,137 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+
+# ==============================
+# Bounded-memory upload handling
+# ==============================
+COPY_CHUNK = 1024 * 1024
+
+# Containers that decode to exactly the same samples front to back, without
+# seeking, as from the finished file, so a streamed upload gets the same
+# timestamps (and hash-keyed cache entries) as the same file decoded by path.
+# MP4/MOV usually keep their index at the end; MP3 decoded without seeking
+# keeps the encoder delay its LAME header would trim (~170 extra samples).
+STREAMABLE_EXTS = [".wav", ".flac", ".mkv"]
+
+
+def copy_upload(src, dst, length=None, chunk_size=COPY_CHUNK, on_chunk=None):
+    # Copies src to dst at most chunk_size bytes at a time, hashing as it goes.
+    # Returns (sha256 hex digest, bytes copied).
+    digest = hashlib.sha256()
+    copied = 0
+    while length is None or copied < length:
+        want = chunk_size if length is None else min(chunk_size, length - copied)
+        block = src.read(want)
+        if not block:
+            break
+        digest.update(block)
+        dst.write(block)
+        copied += len(block)
+        if on_chunk:
+            on_chunk(copied)
+    return digest.hexdigest(), copied
+
+
+def save_upload(src, suffix=""):
+    # Writes a file-like upload to a new temp file; returns (path, sha256 hex).
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        content_hash, _ = copy_upload(src, tmp)
+    return tmp.name, content_hash
+
+
+def is_streamable(path):
+    return os.path.splitext(path)[1].lower() in STREAMABLE_EXTS
+
+
+class StreamingUpload:
+    # A temp file being filled by one thread (feed) while other threads read
+    # it front to back through reader(), blocking until data arrives.
+    def __init__(self, suffix=""):
+        fd, self.path = tempfile.mkstemp(suffix=suffix)
+        self._file = os.fdopen(fd, "wb")
+        self._cond = threading.Condition()
+        self.size = 0
+        self.sha256 = None
+        self.error = None
+        self.done = False
+
+    def feed(self, src, length=None):
+        def on_chunk(copied):
+            self._file.flush()
+            with self._cond:
+                self.size = copied
+                self._cond.notify_all()
+
+        try:
+            content_hash, copied = copy_upload(src, self._file, length, on_chunk=on_chunk)
+            if length is not None and copied < length:
+                raise IOError(f"upload ended after {copied} of {length} bytes")
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        self._finish(sha256=content_hash)
+        return content_hash
+
+    def _finish(self, sha256=None, error=None):
+        self._file.close()
+        with self._cond:
+            self.sha256, self.error, self.done = sha256, error, True
+            self._cond.notify_all()
+
+    def discard(self):
+        if not self.done:
+            self._finish(error=IOError("upload discarded"))
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def wait(self):
+        with self._cond:
+            while not self.done:
+                self._cond.wait()
+        if self.error:
+            raise self.error
+        return self.sha256
+
+    def wait_for(self, offset):
+        # Blocks until `offset` bytes are on disk or the upload ends; returns
+        # the number of bytes currently available.
+        with self._cond:
+            while self.size < offset and not self.done:
+                self._cond.wait()
+            if self.error:
+                raise self.error
+            return self.size
+
+    def reader(self):
+        return _TailReader(self)
+
+
+class _TailReader(io.RawIOBase):
+    def __init__(self, upload):
+        self._upload = upload
+        self._file = open(upload.path, "rb")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        # Forces ffmpeg to demux front to back instead of probing the end.
+        return False
+
+    def readinto(self, buffer):
+        available = self._upload.wait_for(self._pos + 1)
+        n = min(len(buffer), available - self._pos)
+        if n <= 0:
+            return 0
+        data = self._file.read(n)
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()